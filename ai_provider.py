@@ -3,9 +3,21 @@ AI Provider abstraction layer for multiple AI services.
 Supports OpenAI, Claude, Perplexity, and Mistral.
 """
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import Dict, Iterator, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Try to import streamlit for secrets support
 try:
@@ -14,19 +26,309 @@ try:
 except ImportError:
     STREAMLIT_AVAILABLE = False
 
+# orjson speeds up payload encoding/decoding when installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# SDKs are optional: only the ones for the providers in use need to be installed
+try:
+    from openai import OpenAI
+except ImportError:
+    OpenAI = None
+
+try:
+    from anthropic import Anthropic
+except ImportError:
+    Anthropic = None
+
+# (connect, read) timeouts for HTTP provider calls
+HTTP_TIMEOUT = (10, 60)
+
+# Maximum number of provider calls in flight at once (kept below rate limits
+# and below the HTTP session's pool size so calls never queue for a socket)
+MAX_CONCURRENCY = 4
+
+# Model used by each provider
+DEFAULT_MODELS = {
+    'openai': 'gpt-4o',
+    'claude': 'claude-3-5-sonnet-20241022',
+    'grok': 'grok-beta',
+    'perplexity': 'llama-3.1-sonar-large-128k-online',
+    'mistral': 'mistral-large-latest'
+}
+
+# Smaller, cheaper model of each provider, for short and simple tasks
+SMALL_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'claude': 'claude-3-haiku-20240307',
+    'grok': 'grok-beta',
+    'perplexity': 'llama-3.1-sonar-small-128k-online',
+    'mistral': 'mistral-small-latest'
+}
+
+
+# Calls at or below this temperature are cached by default; hotter calls are
+# left uncached so regenerating gives fresh output
+CACHEABLE_TEMPERATURE = 0.3
+
+# Default location and entry lifetime (seconds) of the on-disk response cache
+DISK_CACHE_PATH = ".llm_cache.sqlite3"
+DISK_CACHE_TTL = 7 * 24 * 3600
+
+# Anthropic beta flag enabling prompt caching of blocks marked with cache_control
+PROMPT_CACHING_BETA = "prompt-caching-2024-07-31"
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+class TransientProviderError(Exception):
+    """Provider failed temporarily (rate limit, outage, network); retrying later may succeed."""
+
+
+def _transient_sdk_errors() -> tuple:
+    """Collect the SDK exception types that signal a transient failure."""
+    errors = []
+    if OpenAI is not None:
+        import openai
+        errors += [openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError]
+    if Anthropic is not None:
+        import anthropic
+        errors += [anthropic.RateLimitError, anthropic.APIConnectionError, anthropic.InternalServerError]
+    return tuple(errors)
+
+
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout) + _transient_sdk_errors()
+
+
+@contextmanager
+def _transient_errors(provider: str):
+    """Re-raise retriable provider failures as TransientProviderError."""
+    try:
+        yield
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status in RETRY_STATUSES:
+            raise TransientProviderError(f"{provider} returned HTTP {status}; try again shortly") from e
+        raise
+    except _TRANSIENT_ERRORS as e:
+        raise TransientProviderError(f"{provider} is temporarily unavailable: {e}") from e
+
+
+def _build_session() -> requests.Session:
+    """Build a pooled HTTP session shared by the REST-based providers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+# Module-level session so successive calls reuse established TLS connections
+_SESSION = _build_session()
+
+
+@lru_cache(maxsize=8)
+def _openai_client(api_key: str):
+    """Return a shared OpenAI client for the given API key."""
+    if OpenAI is None:
+        raise ImportError("The 'openai' package is required for the openai provider")
+    return OpenAI(api_key=api_key, timeout=60.0, max_retries=3)
+
+
+@lru_cache(maxsize=8)
+def _anthropic_client(api_key: str):
+    """Return a shared Anthropic client for the given API key."""
+    if Anthropic is None:
+        raise ImportError("The 'anthropic' package is required for the claude provider")
+    return Anthropic(api_key=api_key, timeout=60.0, max_retries=3)
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of AI responses with per-entry expiry.
+    
+    Entries live in memory; when a path is given they are also written to a
+    SQLite file so they survive restarts and are shared between processes.
+    """
+    
+    def __init__(self, max_entries: int = 256, ttl: float = 3600, path: Optional[str] = None):
+        """
+        Initialize response cache.
+        
+        Args:
+            max_entries: Maximum number of responses kept in memory before evicting the oldest
+            ttl: Default lifetime of an entry in seconds
+            path: SQLite file backing the cache; in-memory only if None
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # The SQLite store is opened on the first cacheable call, so callers
+        # that never cache don't create the file
+        self._path = path
+        self._db: Optional[sqlite3.Connection] = None
+    
+    @staticmethod
+    def _open_db(path: str) -> sqlite3.Connection:
+        """Open (and create if needed) the SQLite store."""
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        return db
+    
+    @staticmethod
+    def make_key(
+        provider: str, model: str, system_prompt: str, user_prompt: str, temperature: float
+    ) -> str:
+        """Build a deterministic cache key for a generation request."""
+        payload = json.dumps(
+            {"p": provider, "m": model, "s": system_prompt, "u": user_prompt, "t": temperature},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None and self._store() is not None:
+                entry = self._load(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: str, value: str, expire: Optional[float] = None):
+        """Store a response, evicting the least recently used entries if full."""
+        lifetime = expire or self.ttl
+        with self._lock:
+            self._remember(key, time.monotonic() + lifetime, value)
+            if self._store() is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, expires, value) VALUES (?, ?, ?)",
+                        (key, time.time() + lifetime, value)
+                    )
+                except sqlite3.Error as e:
+                    # The response is still in memory; losing the disk copy is harmless
+                    print(f"Warning: could not write to response cache: {e}")
+    
+    def clear(self):
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            if self._store() is not None:
+                self._db.execute("DELETE FROM responses")
+    
+    def _remember(self, key: str, expires: float, value: str) -> Tuple[float, str]:
+        """Put an entry in the in-memory LRU. Caller holds the lock."""
+        entry = self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+    
+    def _store(self) -> Optional[sqlite3.Connection]:
+        """
+        Get the SQLite store, opening it on first use. Caller holds the lock.
+        
+        Returns None when the cache is memory-only or the file can't be
+        opened; the cache then carries on in memory.
+        """
+        if self._db is None and self._path:
+            try:
+                self._db = self._open_db(self._path)
+            except sqlite3.Error as e:
+                print(f"Warning: could not open response cache {self._path}: {e}")
+                self._path = None
+        return self._db
+    
+    def _load(self, key: str) -> Optional[Tuple[float, str]]:
+        """Read an unexpired entry from disk into memory. Caller holds the lock."""
+        try:
+            row = self._db.execute(
+                "SELECT expires, value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            remaining = row[0] - time.time()
+            if remaining <= 0:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+        except sqlite3.Error as e:
+            # e.g. "database is locked" while another worker writes; treat as a miss
+            print(f"Warning: could not read from response cache: {e}")
+            return None
+        return self._remember(key, time.monotonic() + remaining, row[1])
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize a request payload to JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Parse a JSON response body."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Shared by every AIProvider unless a dedicated cache is passed in
+_RESPONSE_CACHE = ResponseCache()
+
 
 class AIProvider:
     """Abstract AI provider supporting multiple services."""
     
-    def __init__(self, provider: Optional[str] = None):
+    # Chat completion endpoints of the providers called over plain HTTP
+    _HTTP_PROVIDERS = {
+        'grok': "https://api.x.ai/v1/chat/completions",
+        'perplexity': "https://api.perplexity.ai/chat/completions",
+        'mistral': "https://api.mistral.ai/v1/chat/completions"
+    }
+    
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        model: Optional[str] = None
+    ):
         """
         Initialize AI provider.
         
         Args:
             provider: AI provider name ('openai', 'claude', 'perplexity', 'mistral')
                      If None, uses DEFAULT_AI_PROVIDER from .env or Streamlit secrets
+            cache: Response cache to use; defaults to a process-wide shared cache
+            model: Model to call; defaults to the provider's entry in DEFAULT_MODELS
         """
         self.provider = provider or self._get_config('DEFAULT_AI_PROVIDER', 'openai')
+        self.model = model or DEFAULT_MODELS.get(self.provider, '')
         self.api_keys = {
             'openai': self._get_config('OPENAI_API_KEY'),
             'claude': self._get_config('CLAUDE_API_KEY'),
@@ -37,8 +339,19 @@ class AIProvider:
         
         if not self.api_keys.get(self.provider):
             raise ValueError(f"API key for {self.provider} not found in environment variables")
+        
+        # SDK clients are created lazily and reused across calls
+        self._openai_client = None
+        self._anthropic_client = None
+        self._cache = cache or _RESPONSE_CACHE
     
-    def generate(self, system_prompt: str, user_prompt: str, temperature: float = 0.7) -> str:
+    def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        use_cache: Optional[bool] = None
+    ) -> str:
         """
         Generate text using the configured AI provider.
         
@@ -46,30 +359,201 @@ class AIProvider:
             system_prompt: System instruction for the AI
             user_prompt: User query/request
             temperature: Creativity level (0.0-1.0)
+            use_cache: Serve repeated requests from the response cache.
+                       If None, only calls at or below CACHEABLE_TEMPERATURE are cached.
             
         Returns:
             Generated text response
         """
+        if use_cache is None:
+            use_cache = temperature <= CACHEABLE_TEMPERATURE
+        if not use_cache:
+            return self._dispatch(system_prompt, user_prompt, temperature)
+        
+        key = ResponseCache.make_key(
+            self.provider, self.model,
+            system_prompt, user_prompt, temperature
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = self._dispatch(system_prompt, user_prompt, temperature)
+        self._cache.set(key, result)
+        return result
+    
+    def _dispatch(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
+        """Send the request to the configured provider."""
+        with _transient_errors(self.provider):
+            if self.provider == 'openai':
+                return self._generate_openai(system_prompt, user_prompt, temperature)
+            elif self.provider == 'claude':
+                return self._generate_claude(system_prompt, user_prompt, temperature)
+            elif self.provider in self._HTTP_PROVIDERS:
+                return self._generate_http(self.provider, system_prompt, user_prompt, temperature)
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+    
+    def stream_generate(
+        self, system_prompt: str, user_prompt: str, temperature: float = 0.7
+    ) -> Iterator[str]:
+        """
+        Generate text as a stream of chunks, yielded as the provider produces them.
+        
+        Args:
+            system_prompt: System instruction for the AI
+            user_prompt: User query/request
+            temperature: Creativity level (0.0-1.0)
+            
+        Yields:
+            Pieces of the generated text response
+        """
+        with _transient_errors(self.provider):
+            yield from self._stream(system_prompt, user_prompt, temperature)
+    
+    def _stream(self, system_prompt: str, user_prompt: str, temperature: float) -> Iterator[str]:
+        """Stream a response from the configured provider."""
         if self.provider == 'openai':
-            return self._generate_openai(system_prompt, user_prompt, temperature)
+            stream = self._get_openai().chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=temperature,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         elif self.provider == 'claude':
-            return self._generate_claude(system_prompt, user_prompt, temperature)
-        elif self.provider == 'grok':
-            return self._generate_grok(system_prompt, user_prompt, temperature)
-        elif self.provider == 'perplexity':
-            return self._generate_perplexity(system_prompt, user_prompt, temperature)
-        elif self.provider == 'mistral':
-            return self._generate_mistral(system_prompt, user_prompt, temperature)
+            with self._get_anthropic().messages.stream(
+                model=self.model,
+                max_tokens=4096,
+                system=self._claude_system(system_prompt),
+                extra_headers={"anthropic-beta": PROMPT_CACHING_BETA},
+                temperature=temperature,
+                messages=[
+                    {"role": "user", "content": user_prompt}
+                ]
+            ) as stream:
+                yield from stream.text_stream
+        elif self.provider in self._HTTP_PROVIDERS:
+            yield from self._stream_http(self.provider, system_prompt, user_prompt, temperature)
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
     
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float = 0.7,
+        use_cache: Optional[bool] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> str:
+        """
+        Generate text without blocking the event loop.
+        
+        The blocking provider call runs in the loop's default executor so the
+        pooled HTTP session and cached SDK clients are shared with generate().
+        """
+        loop = asyncio.get_running_loop()
+        call = partial(self.generate, system_prompt, user_prompt, temperature, use_cache)
+        if semaphore is None:
+            return await loop.run_in_executor(None, call)
+        async with semaphore:
+            return await loop.run_in_executor(None, call)
+    
+    async def agenerate_many(
+        self,
+        prompts: List[Tuple[str, str]],
+        temperature: float = 0.7,
+        max_concurrency: int = MAX_CONCURRENCY,
+        use_cache: Optional[bool] = None
+    ) -> List[str]:
+        """Generate responses for (system_prompt, user_prompt) pairs concurrently."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+        return list(await asyncio.gather(*(
+            self.agenerate(system_prompt, user_prompt, temperature, use_cache, semaphore)
+            for system_prompt, user_prompt in prompts
+        )))
+    
+    def generate_many(
+        self,
+        prompts: List[Tuple[str, str]],
+        temperature: float = 0.7,
+        max_concurrency: int = MAX_CONCURRENCY,
+        use_cache: Optional[bool] = None
+    ) -> List[str]:
+        """
+        Generate responses for several prompts in parallel.
+        
+        Args:
+            prompts: List of (system_prompt, user_prompt) pairs
+            temperature: Creativity level (0.0-1.0)
+            max_concurrency: Maximum number of calls in flight at once
+            use_cache: Passed through to generate()
+            
+        Returns:
+            Generated text responses, in the same order as prompts
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(
+                self.agenerate_many(prompts, temperature, max_concurrency, use_cache)
+            )
+        
+        # Already inside an event loop (e.g. a notebook), where asyncio.run()
+        # is unavailable: run the calls on a thread pool instead
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(prompts))) as executor:
+            # Submit every call before collecting any result; calling result()
+            # inside the submit loop would run the calls one at a time
+            futures = [
+                executor.submit(self.generate, system_prompt, user_prompt, temperature, use_cache)
+                for system_prompt, user_prompt in prompts
+            ]
+            return [future.result() for future in futures]
+    
+    def prewarm(self, timeout: float = 5):
+        """
+        Open a connection to the provider's API ahead of the first real request.
+        
+        The connection stays in the shared pool, so the first generation skips
+        the TCP/TLS handshake. Any failure is ignored.
+        """
+        try:
+            if self.provider == 'openai':
+                self._get_openai().with_options(timeout=timeout, max_retries=0).models.list()
+            elif self.provider == 'claude':
+                import httpx
+                self._get_anthropic().with_options(timeout=timeout, max_retries=0).get(
+                    "/v1/models", cast_to=httpx.Response
+                )
+            elif self.provider in self._HTTP_PROVIDERS:
+                _SESSION.head(self._HTTP_PROVIDERS[self.provider], timeout=timeout)
+        except Exception:
+            pass
+    
+    def _get_openai(self):
+        """Get the cached OpenAI client, creating it on first use."""
+        if self._openai_client is None:
+            self._openai_client = _openai_client(self.api_keys['openai'])
+        return self._openai_client
+    
+    def _get_anthropic(self):
+        """Get the cached Anthropic client, creating it on first use."""
+        if self._anthropic_client is None:
+            self._anthropic_client = _anthropic_client(self.api_keys['claude'])
+        return self._anthropic_client
+    
     def _generate_openai(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
         """Generate using OpenAI API."""
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=self.api_keys['openai'])
+        client = self._get_openai()
         response = client.chat.completions.create(
-            model="gpt-4o",
+            model=self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
@@ -78,15 +562,24 @@ class AIProvider:
         )
         return response.choices[0].message.content
     
+    @staticmethod
+    def _claude_system(system_prompt: str) -> List[Dict]:
+        """
+        Wrap the system prompt in a block marked for Anthropic prompt caching.
+        
+        Calls sharing the same system prompt then reuse the cached prefix
+        (prompts below the model's minimum cacheable length are sent as normal).
+        """
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+    
     def _generate_claude(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
         """Generate using Claude API."""
-        from anthropic import Anthropic
-        
-        client = Anthropic(api_key=self.api_keys['claude'])
+        client = self._get_anthropic()
         message = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
+            model=self.model,
             max_tokens=4096,
-            system=system_prompt,
+            system=self._claude_system(system_prompt),
+            extra_headers={"anthropic-beta": PROMPT_CACHING_BETA},
             temperature=temperature,
             messages=[
                 {"role": "user", "content": user_prompt}
@@ -94,81 +587,72 @@ class AIProvider:
         )
         return message.content[0].text
     
-    def _generate_grok(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
-        """Generate using Grok API."""
-        headers = {
-            "Authorization": f"Bearer {self.api_keys['grok']}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "grok-beta",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": temperature
-        }
-        
-        response = requests.post(
-            "https://api.x.ai/v1/chat/completions",
-            json=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+    def _generate_http(
+        self, name: str, system_prompt: str, user_prompt: str, temperature: float
+    ) -> str:
+        """Generate using an OpenAI-compatible REST API (Grok, Perplexity, Mistral)."""
+        response = self._post_http(name, system_prompt, user_prompt, temperature)
+        return _json_loads(response.content)['choices'][0]['message']['content']
     
-    def _generate_perplexity(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
-        """Generate using Perplexity API."""
-        headers = {
-            "Authorization": f"Bearer {self.api_keys['perplexity']}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "model": "llama-3.1-sonar-large-128k-online",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            "temperature": temperature
-        }
-        
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
-            json=payload,
-            headers=headers
-        )
-        response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+    def _stream_http(
+        self, name: str, system_prompt: str, user_prompt: str, temperature: float
+    ) -> Iterator[str]:
+        """Stream from an OpenAI-compatible REST API by reading its server-sent events."""
+        response = self._post_http(name, system_prompt, user_prompt, temperature, stream=True)
+        with response:
+            for line in response.iter_lines():
+                if not line.startswith(b"data: "):
+                    continue
+                data = line[len(b"data: "):]
+                if data == b"[DONE]":
+                    break
+                delta = _json_loads(data)['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
     
-    def _generate_mistral(self, system_prompt: str, user_prompt: str, temperature: float) -> str:
-        """Generate using Mistral API."""
+    def _post_http(
+        self,
+        name: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        stream: bool = False
+    ) -> requests.Response:
+        """Send a chat completion request to a REST provider."""
         headers = {
-            "Authorization": f"Bearer {self.api_keys['mistral']}",
+            "Authorization": f"Bearer {self.api_keys[name]}",
             "Content-Type": "application/json"
         }
         
         payload = {
-            "model": "mistral-large-latest",
+            "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             "temperature": temperature
         }
+        if stream:
+            payload["stream"] = True
         
-        response = requests.post(
-            "https://api.mistral.ai/v1/chat/completions",
-            json=payload,
-            headers=headers
+        response = _SESSION.post(
+            self._HTTP_PROVIDERS[name],
+            data=_json_dumps(payload),
+            headers=headers,
+            timeout=HTTP_TIMEOUT,
+            stream=stream
         )
         response.raise_for_status()
-        return response.json()['choices'][0]['message']['content']
+        return response
     
     @staticmethod
+    @lru_cache(maxsize=32)
     def _get_config(key: str, default: str = None) -> Optional[str]:
-        """Get configuration from environment or Streamlit secrets."""
+        """
+        Get configuration from environment or Streamlit secrets.
+        
+        Values are memoized: environment and secrets don't change during a run.
+        """
         # Try environment variable first
         value = os.getenv(key)
         if value:
@@ -183,9 +667,21 @@ class AIProvider:
         
         return default
     
+    @staticmethod
+    def reload_config():
+        """Forget memoized configuration so changed env vars or secrets are picked up."""
+        AIProvider._get_config.cache_clear()
+        AIProvider._configured_providers.cache_clear()
+    
     @staticmethod
     def list_available_providers() -> list:
         """List all AI providers that have API keys configured."""
+        return list(AIProvider._configured_providers())
+    
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _configured_providers() -> Tuple[str, ...]:
+        """Scan configuration for provider API keys once and memoize the result."""
         providers = []
         if AIProvider._get_config('OPENAI_API_KEY'):
             providers.append('openai')
@@ -197,4 +693,4 @@ class AIProvider:
             providers.append('perplexity')
         if AIProvider._get_config('MISTRAL_API_KEY'):
             providers.append('mistral')
-        return providers
+        return tuple(providers)
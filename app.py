@@ -4,14 +4,19 @@ Hosted on GitHub and deployable to Streamlit Community Cloud
 """
 
 import streamlit as st
-import os
 from dotenv import load_dotenv
-from ai_provider import AIProvider
-from brief_generator import BriefGenerator
-from document_formatter import DocumentFormatter
-from supabase_client_manager import SupabaseClientManager
+from ai_provider import AIProvider, TransientProviderError
+from supabase_client_manager import CreateResult, SupabaseClientManager
 from datetime import datetime
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+# brief_generator and document_formatter (python-docx) are imported where
+# they are first used, so sessions that never generate or export skip them
+if TYPE_CHECKING:
+    from brief_generator import BriefGenerator
 
 # Load environment variables
 load_dotenv()
@@ -24,8 +29,62 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
+# Background workers for prefetching Supabase reads
+_PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+# Background workers for saving generated briefs to Supabase
+_WRITER = ThreadPoolExecutor(max_workers=2)
+
+# Display labels for the AI provider selectbox
+_PROVIDER_LABELS = {
+    'openai': '🤖 OpenAI GPT-4o',
+    'claude': '🧠 Claude 3.5 Sonnet',
+    'grok': '✨ Grok (xAI)',
+    'perplexity': '🔍 Perplexity Sonar',
+    'mistral': '⚡ Mistral Large'
+}
+
+# Display titles of the brief sections
+SECTION_TITLES = {
+    'page_type': "📍 Page Type",
+    'page_title': "📄 Page Title",
+    'meta_description': "📝 Meta Description",
+    'target_url': "🔗 Target URL",
+    'h1': "🎯 H1 Heading",
+    'summary_bullets': "📋 Summary Bullets",
+    'internal_links': "🔗 Internal Links",
+    'audience': "👥 Audience",
+    'cta': "📣 CTA / Path",
+    'headings_faq': "📑 Headings & FAQ",
+    'restrictions': "🚫 Restrictions",
+    'requirements': "✅ Requirements"
+}
+
+# Order of the section expanders in the brief view, after the overview
+BRIEF_VIEW_ORDER = (
+    'page_type', 'page_title', 'meta_description', 'target_url', 'h1',
+    'summary_bullets', 'internal_links', 'audience', 'cta',
+    'restrictions', 'requirements', 'headings_faq'
+)
+
+# Static help text shown next to the brief form
+_TIPS = """
+        **Topic**: Clear, specific title for your content
+        
+        **Primary Keyword**: Main SEO target
+        
+        **Secondary Keywords**: Related terms to include (2-5 recommended)
+        
+        **AI Providers**:
+        - GPT-4o: Best all-rounder
+        - Claude: Great for long-form
+        - Grok: Real-time insights
+        - Perplexity: Research-focused
+        - Mistral: Fast & efficient
+        """
+
+# Custom CSS, injected on every run
+_CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -37,22 +96,143 @@ st.markdown("""
         width: 100%;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-def init_session_state():
-    """Initialize session state variables"""
-    if 'client_data' not in st.session_state:
-        st.session_state.client_data = None
-    if 'generated_brief' not in st.session_state:
-        st.session_state.generated_brief = None
-    if 'selected_provider' not in st.session_state:
-        st.session_state.selected_provider = None
-    if 'client_manager' not in st.session_state:
+def provider_label(provider: str) -> str:
+    """Selectbox label for a provider"""
+    return _PROVIDER_LABELS.get(provider, provider.upper())
+
+@st.cache_data(ttl=600, show_spinner=False)
+def available_providers() -> tuple:
+    """Providers with API keys configured, re-read from env/secrets at most every 10 minutes"""
+    AIProvider.reload_config()
+    return tuple(AIProvider.list_available_providers())
+
+@st.cache_resource(show_spinner=False)
+def get_brief_generator(provider: str) -> "BriefGenerator":
+    """Shared BriefGenerator per provider, kept alive across reruns and sessions"""
+    from brief_generator import BriefGenerator
+    
+    return BriefGenerator(provider=provider)
+
+@st.cache_resource(show_spinner=False)
+def get_client_manager() -> SupabaseClientManager:
+    """Process-wide Supabase client manager shared by all sessions"""
+    return SupabaseClientManager()
+
+@st.cache_resource(show_spinner=False)
+def prewarm_connections(_client_manager: "SupabaseClientManager | None"):
+    """Open connections to Supabase and every configured provider in the background, once per process"""
+    def prewarm():
+        if _client_manager is not None:
+            _client_manager.prewarm()
+        for provider in AIProvider.list_available_providers():
+            AIProvider(provider).prewarm()
+    
+    threading.Thread(target=prewarm, daemon=True).start()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_list_clients(_client_manager: SupabaseClientManager) -> list:
+    """Client names from Supabase, cached so reruns don't re-query the database"""
+    return _client_manager.list_clients()
+
+def _lines(text: str) -> list:
+    """Non-empty, stripped lines of a multi-line text input"""
+    return [line for line in (ln.strip() for ln in (text or "").splitlines()) if line]
+
+def clear_client_caches():
+    """Drop cached client data after a create or delete"""
+    cached_list_clients.clear()
+    st.session_state.pop('client_prefetch', None)
+
+def prefetch_client(client_manager: SupabaseClientManager, client_name: str):
+    """Start fetching the selected client in the background so Load Client doesn't wait on Supabase"""
+    prefetch = st.session_state.get('client_prefetch')
+    if prefetch is None or prefetch[0] != client_name:
+        future = _PREFETCH_EXECUTOR.submit(client_manager.get_client, client_name)
+        st.session_state.client_prefetch = (client_name, future)
+
+def load_client(client_manager: SupabaseClientManager, client_name: str):
+    """Get a client profile, using the background prefetch when it matches.
+    
+    A prefetch is used at most once, so a failed fetch or a profile edited
+    elsewhere is fetched again on the next load. Profiles are cached inside
+    the client manager, so neither path needs a Streamlit cache of its own.
+    """
+    prefetch = st.session_state.pop('client_prefetch', None)
+    if prefetch is not None and prefetch[0] == client_name:
         try:
-            st.session_state.client_manager = SupabaseClientManager()
-        except Exception as e:
-            st.session_state.client_manager = None
-            st.sidebar.error(f"⚠️ Supabase connection error: {str(e)}")
+            client_data = prefetch[1].result()
+        except Exception:
+            client_data = None
+        if client_data is not None:
+            return client_data
+    return client_manager.get_client(client_name)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_docx(brief: dict) -> bytes:
+    """Word document bytes for a brief, cached by brief content"""
+    from document_formatter import DocumentFormatter
+    
+    doc_bytes = io.BytesIO()
+    DocumentFormatter().write_brief_document(brief_data=brief, stream=doc_bytes)
+    return doc_bytes.getvalue()
+
+def stream_brief(brief_generator: "BriefGenerator", client_data: dict, topic: str,
+                 primary_kw: str, secondary_kws: list) -> dict:
+    """Generate a brief section by section, rendering each section's text as it arrives"""
+    sections = {}
+    for section in brief_generator.AI_SECTIONS:
+        st.markdown(f"**{SECTION_TITLES[section]}**")
+        sections[section] = st.write_stream(
+            brief_generator.stream_section(section, client_data, topic, primary_kw, secondary_kws)
+        )
+    return brief_generator.complete_brief(sections, client_data, topic, primary_kw, secondary_kws)
+
+def save_brief_in_background(brief_data: dict):
+    """Save a brief to Supabase on a writer thread without blocking the page"""
+    client_manager = st.session_state.client_manager
+    if client_manager is not None:
+        st.session_state.brief_save = _WRITER.submit(client_manager.save_brief, brief_data)
+
+def check_brief_save():
+    """Warn once the last background brief save has finished without being stored"""
+    future = st.session_state.get('brief_save')
+    if future is None or not future.done():
+        return
+    del st.session_state.brief_save
+    try:
+        saved = future.result()
+    except Exception as e:
+        st.warning(f"⚠️ The last brief could not be saved to Supabase: {str(e)}")
+        return
+    if not saved:
+        st.warning("⚠️ The last brief could not be saved to Supabase")
+
+def init_session_state():
+    """Initialize session state variables once per session"""
+    if st.session_state.get('_inited'):
+        return
+    
+    st.session_state.update({
+        'client_data': None,
+        'generated_brief': None,
+        'selected_provider': None,
+        '_inited': True
+    })
+    try:
+        st.session_state.client_manager = get_client_manager()
+    except Exception as e:
+        st.session_state.client_manager = None
+        st.sidebar.error(f"⚠️ Supabase connection error: {str(e)}")
+
+def inject_css():
+    """Inject the custom CSS.
+    
+    Streamlit drops any element that isn't re-emitted on a rerun, so this
+    can't be skipped after the first run; it is a single static markdown call.
+    """
+    st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 def display_header():
     """Display application header"""
@@ -76,7 +256,7 @@ def sidebar_client_management():
         
         # Get list of clients from Supabase
         try:
-            client_list = st.session_state.client_manager.list_clients()
+            client_list = cached_list_clients(st.session_state.client_manager)
             
             if client_list:
                 selected_client = st.selectbox(
@@ -84,22 +264,23 @@ def sidebar_client_management():
                     options=client_list,
                     key="client_selector"
                 )
+                prefetch_client(st.session_state.client_manager, selected_client)
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
                     if st.button("📂 Load Client", use_container_width=True):
-                        client_data = st.session_state.client_manager.get_client(selected_client)
+                        client_data = load_client(st.session_state.client_manager, selected_client)
                         if client_data:
                             st.session_state.client_data = client_data
                             st.success(f"✅ Loaded: {selected_client}")
-                            st.rerun()
                         else:
                             st.error("Failed to load client")
                 
                 with col2:
                     if st.button("🗑️ Delete", use_container_width=True):
                         if st.session_state.client_manager.delete_client(selected_client):
+                            clear_client_caches()
                             st.success(f"Deleted: {selected_client}")
                             if st.session_state.client_data and st.session_state.client_data.get('client_name') == selected_client:
                                 st.session_state.client_data = None
@@ -138,55 +319,56 @@ def sidebar_client_management():
             submitted = st.form_submit_button("💾 Save Client")
             if submitted:
                 if client_name and industry and target_audience and brand_voice and content_goals:
-                    # Check if client already exists
-                    if st.session_state.client_manager.client_exists(client_name):
-                        st.error(f"❌ Client '{client_name}' already exists!")
-                    else:
-                        # Process things to avoid and must include
-                        avoid_list = [item.strip() for item in things_to_avoid.split('\n') if item.strip()] if things_to_avoid else []
-                        must_include_list = [item.strip() for item in things_must_include.split('\n') if item.strip()] if things_must_include else []
-                        
-                        # Create client data
-                        client_data = {
-                            "client_name": client_name,
-                            "site": website if website else "",
-                            "industry": industry,
-                            "target_audience": target_audience,
-                            "brand_voice": brand_voice,
-                            "content_goals": content_goals,
-                            "restrictions": {
-                                "legal": [],
-                                "brand": avoid_list,
-                                "seo": [],
-                                "content_integrity": []
-                            },
-                            "requirements": {
-                                "word_count": None,
-                                "tone": brand_voice,
-                                "mandatory_mentions": must_include_list,
-                                "readability_score": "",
-                                "schema_required": False,
-                                "images_required": 0,
-                                "cta_required": True,
-                                "internal_links_min": 6
-                            }
+                    # Process things to avoid and must include
+                    avoid_list = _lines(things_to_avoid)
+                    must_include_list = _lines(things_must_include)
+                    
+                    # Create client data
+                    client_data = {
+                        "client_name": client_name,
+                        "site": website if website else "",
+                        "industry": industry,
+                        "target_audience": target_audience,
+                        "brand_voice": brand_voice,
+                        "content_goals": content_goals,
+                        "restrictions": {
+                            "legal": [],
+                            "brand": avoid_list,
+                            "seo": [],
+                            "content_integrity": []
+                        },
+                        "requirements": {
+                            "word_count": None,
+                            "tone": brand_voice,
+                            "mandatory_mentions": must_include_list,
+                            "readability_score": "",
+                            "schema_required": False,
+                            "images_required": 0,
+                            "cta_required": True,
+                            "internal_links_min": 6
                         }
-                        
-                        # Save to Supabase
-                        try:
-                            if st.session_state.client_manager.create_client(client_name, client_data):
-                                st.session_state.client_data = client_data
-                                st.success(f"✅ Client '{client_name}' created and saved to Supabase!")
-                                st.rerun()
-                            else:
-                                st.error("Failed to save client to database")
-                        except Exception as e:
-                            st.error(f"Error saving client: {str(e)}")
+                    }
+                    
+                    # Save to Supabase (duplicates are rejected by the database)
+                    try:
+                        result = st.session_state.client_manager.create_client_if_absent(client_name, client_data)
+                        if result is CreateResult.CREATED:
+                            clear_client_caches()
+                            st.session_state.client_data = client_data
+                            st.success(f"✅ Client '{client_name}' created and saved to Supabase!")
+                        elif result is CreateResult.EXISTS:
+                            st.error(f"❌ Client '{client_name}' already exists!")
+                        else:
+                            st.error("Failed to save client to database")
+                    except Exception as e:
+                        st.error(f"Error saving client: {str(e)}")
                 else:
                     st.error("⚠️ Please fill in all required fields")
 
+@st.fragment
 def main_content():
     """Main content area for brief generation"""
+    check_brief_save()
     
     # Check if client is selected
     if st.session_state.client_data is None:
@@ -219,22 +401,21 @@ def main_content():
             )
             
             # AI Provider selection
-            available_providers = AIProvider.list_available_providers()
+            providers = available_providers()
             
-            if not available_providers:
+            if not providers:
                 st.error("❌ No AI provider API keys found. Please configure at least one provider in your secrets.")
                 return
             
             provider = st.selectbox(
                 "AI Provider*",
-                options=available_providers,
-                format_func=lambda x: {
-                    'openai': '🤖 OpenAI GPT-4o',
-                    'claude': '🧠 Claude 3.5 Sonnet',
-                    'grok': '✨ Grok (xAI)',
-                    'perplexity': '🔍 Perplexity Sonar',
-                    'mistral': '⚡ Mistral Large'
-                }.get(x, x.upper())
+                options=providers,
+                format_func=provider_label
+            )
+            
+            stream_output = st.checkbox(
+                "Stream output live",
+                help="Show each section as it is written. Sections are generated one after another, so the full brief takes longer."
             )
             
             submitted = st.form_submit_button("🚀 Generate Brief", type="primary")
@@ -243,47 +424,54 @@ def main_content():
                 if topic and primary_kw and secondary_kws_input:
                     # Parse secondary keywords
                     secondary_kws = [kw.strip() for kw in secondary_kws_input.split(',') if kw.strip()]
+                    brief_args = dict(
+                        client_data=st.session_state.client_data,
+                        topic=topic,
+                        primary_kw=primary_kw,
+                        secondary_kws=secondary_kws
+                    )
                     
-                    with st.spinner(f'Generating content brief with {provider.upper()}...'):
-                        try:
-                            # Initialize brief generator
-                            brief_generator = BriefGenerator(provider=provider)
-                            
-                            # Generate brief
-                            brief_data = brief_generator.generate_brief(
-                                client_data=st.session_state.client_data,
-                                topic=topic,
-                                primary_kw=primary_kw,
-                                secondary_kws=secondary_kws
-                            )
-                            
-                            st.session_state.generated_brief = brief_data
-                            st.session_state.selected_provider = provider
-                            st.success("✅ Brief generated successfully!")
-                            st.rerun()
-                            
-                        except Exception as e:
-                            st.error(f"❌ Error generating brief: {str(e)}")
+                    try:
+                        # Get the shared brief generator
+                        brief_generator = get_brief_generator(provider)
+                        
+                        # Generate brief
+                        if stream_output:
+                            brief_data = stream_brief(brief_generator, **brief_args)
+                        else:
+                            with st.spinner(f'Generating content brief with {provider.upper()}...'):
+                                brief_data = brief_generator.generate_brief(**brief_args)
+                        
+                        # Stable id for this brief, used in the export filename
+                        brief_data["_id"] = datetime.now().strftime("%Y%m%d_%H%M%S")
+                        st.session_state.generated_brief = brief_data
+                        st.session_state.selected_provider = provider
+                        save_brief_in_background(brief_data)
+                        st.success("✅ Brief generated successfully!")
+                        st.rerun()
+                        
+                    except TransientProviderError as e:
+                        st.warning(f"⏳ {provider.upper()} is busy or unreachable right now. Please try again in a moment. ({str(e)})")
+                    except Exception as e:
+                        st.error(f"❌ Error generating brief: {str(e)}")
                 else:
                     st.error("Please fill in all required fields")
     
     with col2:
         st.subheader("ℹ️ Tips")
-        st.info("""
-        **Topic**: Clear, specific title for your content
-        
-        **Primary Keyword**: Main SEO target
-        
-        **Secondary Keywords**: Related terms to include (2-5 recommended)
-        
-        **AI Providers**:
-        - GPT-4o: Best all-rounder
-        - Claude: Great for long-form
-        - Grok: Real-time insights
-        - Perplexity: Research-focused
-        - Mistral: Fast & efficient
-        """)
+        st.info(_TIPS)
 
+def display_brief_overview(brief: dict):
+    """Expanded overview block with the brief's client and keyword details"""
+    with st.expander("📌 Brief Overview", expanded=True):
+        st.markdown(f"**Client:** {brief.get('client_name', 'N/A')}")
+        st.markdown(f"**Site:** {brief.get('site', 'N/A')}")
+        st.markdown(f"**Topic:** {brief.get('topic', 'N/A')}")
+        st.markdown(f"**Primary Keyword:** {brief.get('primary_kw', 'N/A')}")
+        st.markdown(f"**Secondary Keywords:** {brief.get('secondary_kws', 'N/A')}")
+        st.markdown(f"**Generated with:** {st.session_state.selected_provider.upper()}")
+
+@st.fragment
 def display_generated_brief():
     """Display the generated brief"""
     if st.session_state.generated_brief:
@@ -296,102 +484,45 @@ def display_generated_brief():
         col1, col2 = st.columns([3, 1])
         
         with col1:
-            with st.expander("📌 Brief Overview", expanded=True):
-                st.markdown(f"**Client:** {brief.get('client_name', 'N/A')}")
-                st.markdown(f"**Site:** {brief.get('site', 'N/A')}")
-                st.markdown(f"**Topic:** {brief.get('topic', 'N/A')}")
-                st.markdown(f"**Primary Keyword:** {brief.get('primary_kw', 'N/A')}")
-                st.markdown(f"**Secondary Keywords:** {brief.get('secondary_kws', 'N/A')}")
-                st.markdown(f"**Generated with:** {st.session_state.selected_provider.upper()}")
-            
-            with st.expander("📍 Page Type", expanded=False):
-                st.markdown(brief.get('page_type', 'N/A'))
-            
-            with st.expander("📄 Page Title", expanded=False):
-                st.markdown(brief.get('page_title', 'N/A'))
-            
-            with st.expander("📝 Meta Description", expanded=False):
-                st.markdown(brief.get('meta_description', 'N/A'))
-            
-            with st.expander("🔗 Target URL", expanded=False):
-                st.markdown(brief.get('target_url', 'N/A'))
-            
-            with st.expander("🎯 H1 Heading", expanded=False):
-                st.markdown(brief.get('h1', 'N/A'))
-            
-            with st.expander("📋 Summary Bullets", expanded=False):
-                st.markdown(brief.get('summary_bullets', 'N/A'))
+            display_brief_overview(brief)
             
-            with st.expander("🔗 Internal Links", expanded=False):
-                st.markdown(brief.get('internal_links', 'N/A'))
-            
-            with st.expander("👥 Audience", expanded=False):
-                st.markdown(brief.get('audience', 'N/A'))
-            
-            with st.expander("📣 CTA / Path", expanded=False):
-                st.markdown(brief.get('cta', 'N/A'))
-            
-            with st.expander("🚫 Restrictions", expanded=False):
-                st.markdown(brief.get('restrictions', 'N/A'))
-            
-            with st.expander("✅ Requirements", expanded=False):
-                st.markdown(brief.get('requirements', 'N/A'))
-            
-            with st.expander("📑 Headings & FAQ", expanded=False):
-                st.markdown(brief.get('headings_faq', 'N/A'))
+            for section in BRIEF_VIEW_ORDER:
+                with st.expander(SECTION_TITLES[section], expanded=False):
+                    st.markdown(brief.get(section, 'N/A'))
         
         with col2:
             st.markdown("### 💾 Export")
             
-            # Generate Word document
-            if st.button("📄 Download as Word Doc", type="primary"):
-                try:
-                    formatter = DocumentFormatter()
-                    
-                    # Create document and save to temp file
-                    doc_path = formatter.create_brief_document(
-                        brief_data=brief,
-                        output_dir="temp_output"
-                    )
-                    
-                    # Read the saved document into memory
-                    with open(doc_path, 'rb') as f:
-                        doc_bytes_data = f.read()
-                    
-                    # Clean up temp file and directory
-                    import os
-                    import shutil
-                    os.remove(doc_path)
-                    if os.path.exists("temp_output") and not os.listdir("temp_output"):
-                        shutil.rmtree("temp_output")
-                    
-                    # Create BytesIO object for download
-                    doc_bytes = io.BytesIO(doc_bytes_data)
-                    
-                    # Create filename
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    client_name = brief.get('client_name', 'Client').replace(' ', '_')
-                    topic = brief.get('topic', 'untitled').replace(' ', '_')[:30]
-                    filename = f"{client_name}_{topic}_{timestamp}.docx"
-                    
-                    # Download button
-                    st.download_button(
-                        label="⬇️ Click to Download",
-                        data=doc_bytes,
-                        file_name=filename,
-                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                    )
-                    
-                except Exception as e:
-                    st.error(f"Error creating document: {str(e)}")
+            # Word document (cached per brief, so reruns don't rebuild it)
+            try:
+                doc_bytes = render_docx(brief)
+                
+                # Create filename
+                client_name = brief.get('client_name', 'Client').replace(' ', '_')
+                topic = brief.get('topic', 'untitled').replace(' ', '_')[:30]
+                filename = f"{client_name}_{topic}_{brief['_id']}.docx"
+                
+                # Download button
+                st.download_button(
+                    label="📄 Download as Word Doc",
+                    data=doc_bytes,
+                    file_name=filename,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                    type="primary"
+                )
+                
+            except Exception as e:
+                st.error(f"Error creating document: {str(e)}")
             
             if st.button("🔄 Generate New Brief"):
                 st.session_state.generated_brief = None
-                st.rerun()
+                st.rerun(scope="fragment")
 
 def main():
     """Main application function"""
     init_session_state()
+    prewarm_connections(st.session_state.client_manager)
+    inject_css()
     display_header()
     sidebar_client_management()
     main_content()
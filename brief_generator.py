@@ -3,106 +3,19 @@ AI Content Brief Generator
 Generates comprehensive content briefs using multiple AI providers.
 """
 
-from typing import Dict, List, Optional
-from ai_provider import AIProvider
-
-
-class BriefGenerator:
-    """Generates content briefs using AI based on client profiles."""
-    
-    def __init__(self, provider: Optional[str] = None):
-        """
-        Initialize brief generator with specified AI provider.
-        
-        Args:
-            provider: AI provider name ('openai', 'claude', 'perplexity', 'mistral')
-                     If None, uses DEFAULT_AI_PROVIDER from .env
-        """
-        self.ai_provider = AIProvider(provider)
-    
-    def generate_brief(
-        self,
-        client_data: Dict,
-        topic: str,
-        primary_kw: str,
-        secondary_kws: List[str]
-    ) -> Dict[str, str]:
-        """Generate a complete content brief."""
-        
-        brief_sections = {}
-        
-        # System instruction for absolute mode
-        system_instruction = self._get_system_instruction()
-        
-        # Generate each section
-        print("Generating Page Type...")
-        brief_sections["page_type"] = self._generate_page_type(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Page Title...")
-        brief_sections["page_title"] = self._generate_page_title(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Meta Description...")
-        brief_sections["meta_description"] = self._generate_meta_description(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Target URL...")
-        brief_sections["target_url"] = self._generate_target_url(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating H1 Heading...")
-        brief_sections["h1"] = self._generate_h1(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Summary Bullets...")
-        brief_sections["summary_bullets"] = self._generate_summary_bullets(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Internal Linking Table...")
-        brief_sections["internal_links"] = self._generate_internal_links(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Audience Definition...")
-        brief_sections["audience"] = self._generate_audience(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating CTA/Path...")
-        brief_sections["cta"] = self._generate_cta(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        print("Generating Restrictions...")
-        brief_sections["restrictions"] = self._format_restrictions(client_data)
-        
-        print("Generating Requirements...")
-        brief_sections["requirements"] = self._format_requirements(client_data)
-        
-        print("Generating Suggested Headings & FAQ...")
-        brief_sections["headings_faq"] = self._generate_headings_faq(
-            system_instruction, client_data, topic, primary_kw, secondary_kws
-        )
-        
-        # Add metadata
-        brief_sections["client_name"] = client_data["client_name"]
-        brief_sections["topic"] = topic
-        brief_sections["site"] = client_data["site"]
-        brief_sections["primary_kw"] = primary_kw
-        brief_sections["secondary_kws"] = ", ".join(secondary_kws)
-        
-        return brief_sections
-    
-    def _get_system_instruction(self) -> str:
-        """Get the absolute mode system instruction."""
-        return """System Instruction: Absolute Mode
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
+from typing import AsyncIterator, Dict, Final, Iterator, List, Optional, Tuple
+from ai_provider import (
+    DISK_CACHE_PATH, DISK_CACHE_TTL, MAX_CONCURRENCY, SMALL_MODELS, AIProvider, ResponseCache
+)
+from semantic_cache import SemanticCache
+
+
+# Absolute mode system instruction, the start of every section's system prompt
+_SYSTEM_INSTRUCTION: Final[str] = """System Instruction: Absolute Mode
 • Eliminate: emojis, filler, hype, soft asks, conversational transitions, call-to-action appendixes.
 • Assume: user retains high-perception despite blunt tone.
 • Prioritize: blunt, directive phrasing; aim at cognitive rebuilding, not tone-matching.
@@ -116,43 +29,24 @@ class BriefGenerator:
 • Outcome: model obsolescence via user self-sufficiency.
 
 Use UK English. Use hyphens rather than em-dashes. Write at 8th grade reading level. Simple words only."""
-    
-    def _call_ai(self, system_instruction: str, user_prompt: str) -> str:
-        """Call AI provider with system instruction and user prompt."""
-        return self.ai_provider.generate(system_instruction, user_prompt, temperature=0.7)
-    
-    def _generate_page_type(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate page type identification."""
-        prompt = f"""Determine whether this content should be a Landing Page or Blog Post.
 
-Topic: {topic}
-Primary keyword: {primary_kw}
-Secondary keywords: {', '.join(secondary_kws)}
+
+# Section prompt templates; $primary_kw is filled in per brief (the topic and
+# secondary keywords reach the model through the shared brief context)
+_SECTION_TEMPLATES: Final[Dict[str, Template]] = {
+    # Page type identification
+    "page_type": Template("""Determine whether this content should be a Landing Page or Blog Post.
 
 Rules:
 - If transactional, commercial, or service-based intent → Landing Page
 - If informational, educational, or research-based → Blog Post
 
-Output one sentence explaining your reasoning based on search intent, funnel stage, and conversion goals."""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_page_title(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate page title following SEO best practices."""
-        prompt = f"""Create the Page Title following SEO best practices:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
-Brand: {client_data['client_name']}
+Output one sentence explaining your reasoning based on search intent, funnel stage, and conversion goals."""),
+    # Page title following SEO best practices
+    "page_title": Template("""Create the Page Title following SEO best practices:
 
 Rules:
-- Lead with {primary_kw} or close variant
+- Lead with $primary_kw or close variant
 - Keep people-first and accurate
 - Limit to ≤ 60 characters
 - Include brand name at end only if adds relevance
@@ -162,44 +56,22 @@ Rules:
 
 Output:
 1. The title
-2. Self-check list (yes/no): keyword early – unique – intent match – ~60 chars – readable"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_meta_description(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate meta description."""
-        prompt = f"""Write the Meta Description:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
-Secondary keywords: {', '.join(secondary_kws)}
+2. Self-check list (yes/no): keyword early – unique – intent match – ~60 chars – readable"""),
+    # Meta description
+    "meta_description": Template("""Write the Meta Description:
 
 Rules:
 - Summarise page accurately; no keyword stuffing
-- Include {primary_kw} naturally + one secondary keyword if smooth
+- Include $primary_kw naturally + one secondary keyword if smooth
 - Active voice + soft CTA ("Learn", "Discover", "Get insight")
 - Aim for 150-160 characters but prioritise clarity
 - Must align with on-page content
 
 Output:
 1. The description
-2. Self-check list (yes/no): accurate – natural keywords – CTA – ~155 chars – matches content"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_target_url(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate target URL."""
-        prompt = f"""Generate the Target URL:
-
-Site: {client_data['site']}
-Topic: {topic}
-Primary keyword: {primary_kw}
+2. Self-check list (yes/no): accurate – natural keywords – CTA – ~155 chars – matches content"""),
+    # Target URL
+    "target_url": Template("""Generate the Target URL:
 
 Rules:
 - Lowercase, hyphenated, clean, descriptive
@@ -209,40 +81,20 @@ Rules:
 
 Output:
 1. Full canonical URL
-2. Self-check list (yes/no): descriptive – hyphenated – lowercase – fits folder – minimal length"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_h1(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate H1 heading."""
-        prompt = f"""Create the H1 Heading:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
+2. Self-check list (yes/no): descriptive – hyphenated – lowercase – fits folder – minimal length"""),
+    # H1 heading
+    "h1": Template("""Create the H1 Heading:
 
 Rules:
-- Contain {primary_kw} early, naturally
+- Contain $primary_kw early, naturally
 - Closely match title topic but may vary for readability
 - Reader-focused, clear, benefit-driven
 
 Output:
 1. H1 text only
-2. Self-check list (yes/no): keyword used – topic clear – distinct from title – user-centric"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_summary_bullets(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate summary bullets."""
-        prompt = f"""Write 4-6 short bullet points (one line each) summarising key outcomes:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
+2. Self-check list (yes/no): keyword used – topic clear – distinct from title – user-centric"""),
+    # Summary bullets
+    "summary_bullets": Template("""Write 4-6 short bullet points (one line each) summarising key outcomes:
 
 Rules:
 - No heading label
@@ -253,20 +105,9 @@ Rules:
 
 Output:
 1. Bullets only
-2. Self-check list (yes/no): full scope – concise – reader benefit – maps to content – plain language"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_internal_links(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate internal linking table."""
-        prompt = f"""Build Internal Linking table:
-
-Site: {client_data['site']}
-Primary keyword: {primary_kw}
-Secondary keywords: {', '.join(secondary_kws)}
+2. Self-check list (yes/no): full scope – concise – reader benefit – maps to content – plain language"""),
+    # Internal linking table
+    "internal_links": Template("""Build Internal Linking table:
 
 Rules:
 - 6-10 links (Landing Page → 6-8; Blog → 8-10)
@@ -279,20 +120,9 @@ Output as markdown table:
 
 Note: Mark unverified links as "Needs verification" in HTTP Status column.
 
-Then self-check (yes/no): anchors descriptive – mix of intent types – site-consistent URLs – no duplicates"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_audience(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate audience definition."""
-        prompt = f"""Identify who the content is written for:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
-Client: {client_data['client_name']}
+Then self-check (yes/no): anchors descriptive – mix of intent types – site-consistent URLs – no duplicates"""),
+    # Audience definition
+    "audience": Template("""Identify who the content is written for:
 
 Rules:
 - Define 1-2 clear personas – include role/title, industry, pain point, funnel stage
@@ -301,20 +131,9 @@ Rules:
 
 Output:
 1. Paragraph
-2. Self-check: personas clear – funnel stage – brand fit – relevant to keywords"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _generate_cta(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate CTA and path."""
-        prompt = f"""Suggest Primary and Secondary CTAs and logical next step:
-
-Site: {client_data['site']}
-Topic: {topic}
-Primary keyword: {primary_kw}
+2. Self-check: personas clear – funnel stage – brand fit – relevant to keywords"""),
+    # CTA and path
+    "cta": Template("""Suggest Primary and Secondary CTAs and logical next step:
 
 Rules:
 - Match content type (blogs → soft CTAs; landing → direct)
@@ -327,69 +146,9 @@ Output:
 2. Secondary CTA text (optional)
 3. Suggested URL
 4. Placement note
-5. Self-check: CTA fits intent – path logical – language compliant"""
-        
-        return self._call_ai(system_instruction, prompt)
-    
-    def _format_restrictions(self, client_data: Dict) -> str:
-        """Format restrictions from client profile."""
-        restrictions = client_data.get("restrictions", {})
-        
-        output = "Legal restrictions:\n"
-        for item in restrictions.get("legal", []):
-            output += f"- {item}\n"
-        
-        output += "\nBrand restrictions:\n"
-        for item in restrictions.get("brand", []):
-            output += f"- {item}\n"
-        
-        output += "\nSEO restrictions:\n"
-        for item in restrictions.get("seo", []):
-            output += f"- {item}\n"
-        
-        output += "\nContent-integrity restrictions:\n"
-        for item in restrictions.get("content_integrity", []):
-            output += f"- {item}\n"
-        
-        return output
-    
-    def _format_requirements(self, client_data: Dict) -> str:
-        """Format requirements from client profile."""
-        reqs = client_data.get("requirements", {})
-        
-        output = ""
-        if reqs.get("word_count"):
-            output += f"- Word count: {reqs['word_count']}\n"
-        if reqs.get("readability_score"):
-            output += f"- Readability: {reqs['readability_score']}\n"
-        if reqs.get("tone"):
-            output += f"- Tone: {reqs['tone']}\n"
-        if reqs.get("mandatory_mentions"):
-            output += f"- Mandatory mentions: {', '.join(reqs['mandatory_mentions'])}\n"
-        if reqs.get("schema_required"):
-            output += "- Schema markup required\n"
-        if reqs.get("images_required"):
-            output += f"- Minimum images: {reqs['images_required']}\n"
-        if reqs.get("cta_required"):
-            output += "- CTA required\n"
-        if reqs.get("internal_links_min"):
-            output += f"- Minimum internal links: {reqs['internal_links_min']}\n"
-        
-        output += "\nSelf-check: all mandatory items – site fit – brand consistent – tone aligned"
-        
-        return output
-    
-    def _generate_headings_faq(
-        self, system_instruction: str, client_data: Dict,
-        topic: str, primary_kw: str, secondary_kws: List[str]
-    ) -> str:
-        """Generate suggested headings and FAQ."""
-        prompt = f"""Build complete outline for the writer:
-
-Topic: {topic}
-Primary keyword: {primary_kw}
-Secondary keywords: {', '.join(secondary_kws)}
-Mandatory mentions: {', '.join(client_data.get('requirements', {}).get('mandatory_mentions', []))}
+5. Self-check: CTA fits intent – path logical – language compliant"""),
+    # Suggested headings and FAQ
+    "headings_faq": Template("""Build complete outline for the writer:
 
 Rules:
 - Use logical H2-H3 hierarchy (4-6 main H2s, each with 1-2 H3s if needed)
@@ -416,6 +175,392 @@ FAQ
 2. [Question 2]
 ...
 
-Then self-check: H1 matches – flow logical – points actionable – keywords natural – FAQ relevant"""
+Then self-check: H1 matches – flow logical – points actionable – keywords natural – FAQ relevant"""),
+}
+
+
+# Restriction groups in brief order: (label, profile key)
+_RESTRICTION_GROUPS: Final[Tuple[Tuple[str, str], ...]] = (
+    ("Legal", "legal"),
+    ("Brand", "brand"),
+    ("SEO", "seo"),
+    ("Content-integrity", "content_integrity"),
+)
+
+
+@lru_cache(maxsize=128)
+def _restrictions_text(groups: Tuple[Tuple[str, ...], ...]) -> str:
+    """Format the restrictions section from each group's items, in _RESTRICTION_GROUPS order."""
+    lines = []
+    for (label, _), items in zip(_RESTRICTION_GROUPS, groups):
+        if lines:
+            lines.append("")
+        lines.append(f"{label} restrictions:")
+        lines.extend(f"- {item}" for item in items)
+    
+    return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=128)
+def _requirements_text(
+    word_count, readability_score, tone, mandatory_mentions: Tuple[str, ...],
+    schema_required, images_required, cta_required, internal_links_min
+) -> str:
+    """Format the requirements section from the profile's requirement values."""
+    lines = []
+    if word_count:
+        lines.append(f"- Word count: {word_count}")
+    if readability_score:
+        lines.append(f"- Readability: {readability_score}")
+    if tone:
+        lines.append(f"- Tone: {tone}")
+    if mandatory_mentions:
+        lines.append(f"- Mandatory mentions: {', '.join(mandatory_mentions)}")
+    if schema_required:
+        lines.append("- Schema markup required")
+    if images_required:
+        lines.append(f"- Minimum images: {images_required}")
+    if cta_required:
+        lines.append("- CTA required")
+    if internal_links_min:
+        lines.append(f"- Minimum internal links: {internal_links_min}")
+    
+    lines.append("")
+    lines.append("Self-check: all mandatory items – site fit – brand consistent – tone aligned")
+    
+    return "\n".join(lines)
+
+
+def _format_cached(formatter, *args) -> str:
+    """
+    Call an lru_cached section formatter.
+    
+    Profiles are hand-edited or come from Supabase, so a value may be a dict
+    or another unhashable type; those calls skip the cache instead of failing.
+    """
+    try:
+        hash(args)
+    except TypeError:
+        return formatter.__wrapped__(*args)
+    return formatter(*args)
+
+
+class BriefGenerator:
+    """Generates content briefs using AI based on client profiles."""
+    
+    # Sections written by the AI, in document order
+    AI_SECTIONS = (
+        "page_type",
+        "page_title",
+        "meta_description",
+        "target_url",
+        "h1",
+        "summary_bullets",
+        "internal_links",
+        "audience",
+        "cta",
+        "headings_faq",
+    )
+    
+    # Short, simple sections that the provider's small model handles well
+    SMALL_MODEL_SECTIONS = (
+        "page_type",
+        "target_url",
+        "h1",
+        "summary_bullets",
+    )
+    
+    def __init__(
+        self,
+        provider: Optional[str] = None,
+        temperature: float = 0.7,
+        cache_enabled: bool = False,
+        cache_ttl: float = DISK_CACHE_TTL,
+        semantic_cache: bool = False,
+        routing: Optional[Dict[str, Tuple[str, str]]] = None
+    ):
+        """
+        Initialize brief generator with specified AI provider.
+        
+        Args:
+            provider: AI provider name ('openai', 'claude', 'perplexity', 'mistral')
+                     If None, uses DEFAULT_AI_PROVIDER from .env
+            temperature: Creativity level used for every section (0.0-1.0)
+            cache_enabled: Keep every response in an on-disk cache keyed by provider,
+                           model, prompts and temperature, so repeat briefs skip
+                           the provider. Off by default, in which case only calls
+                           at or below CACHEABLE_TEMPERATURE are cached (in memory),
+                           so briefs at the default temperature are never cached.
+            cache_ttl: Lifetime of a cached response in seconds
+            semantic_cache: Reuse earlier section responses from briefs for the same
+                            client and primary keyword whose topic and secondary
+                            keywords are nearly identical in meaning, at any
+                            temperature (needs sentence-transformers and faiss-cpu)
+            routing: (provider, model) to use for each section; sections not listed
+                     use the main provider. If None, SMALL_MODEL_SECTIONS go to the
+                     main provider's small model. Pass {} to send every section
+                     to the main provider.
+        """
+        self.temperature = temperature
+        self._cache = ResponseCache(ttl=cache_ttl, path=DISK_CACHE_PATH) if cache_enabled else None
+        # Opting in caches at any temperature; otherwise AIProvider's own rule applies
+        self._use_cache = True if cache_enabled else None
+        self.ai_provider = AIProvider(provider, cache=self._cache)
+        self.semantic_cache = SemanticCache() if semantic_cache else None
+        
+        if routing is None:
+            small_model = SMALL_MODELS.get(self.ai_provider.provider)
+            routing = {
+                section: (self.ai_provider.provider, small_model)
+                for section in self.SMALL_MODEL_SECTIONS
+            } if small_model else {}
+        self.routing = routing
+        
+        # Providers for routed sections, keyed by (provider, model), created on first use
+        self._providers: Dict[Tuple[str, str], AIProvider] = {}
+    
+    def generate_brief(
+        self,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> Dict[str, str]:
+        """Generate a complete content brief."""
+        coroutine = self.generate_brief_async(client_data, topic, primary_kw, secondary_kws)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        
+        # Already inside an event loop (e.g. a notebook), where asyncio.run()
+        # is unavailable: give the brief its own loop on a worker thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+    
+    async def generate_brief_async(
+        self,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> Dict[str, str]:
+        """Generate a complete content brief from inside a running event loop."""
+        sections = {
+            section: text
+            async for section, text in self._aiter_ai_sections(client_data, topic, primary_kw, secondary_kws)
+        }
+        brief_sections = {section: sections[section] for section in self.AI_SECTIONS}
+        
+        return self.complete_brief(brief_sections, client_data, topic, primary_kw, secondary_kws)
+    
+    async def iter_sections_async(
+        self,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yield (section, text) pairs as each section becomes available.
+        
+        The client-profile sections come first, then the AI-written sections
+        in the order their responses arrive rather than document order.
+        """
+        yield "restrictions", self._format_restrictions(client_data)
+        yield "requirements", self._format_requirements(client_data)
+        
+        async for section, text in self._aiter_ai_sections(client_data, topic, primary_kw, secondary_kws):
+            yield section, text
+    
+    async def _aiter_ai_sections(
+        self,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yield (section, text) for every AI-written section of a brief.
+        
+        Semantic cache hits come first; the remaining sections are requested
+        together, bounded by MAX_CONCURRENCY, and yielded (and stored in the
+        semantic cache) in the order their responses arrive.
+        """
+        # Absolute mode instruction plus the brief details shared by every section
+        context = self._brief_context(client_data, topic, primary_kw, secondary_kws)
+        system_instruction = self._system_prompt(context)
+        prompts = self._build_section_prompts(primary_kw)
+        
+        semantic_key = self._semantic_key(client_data, topic, primary_kw, secondary_kws)
+        cached = self._semantic_hits(semantic_key, prompts)
+        for section, text in cached.items():
+            yield section, text
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        
+        async def generate_section(section: str) -> Tuple[str, str]:
+            text = await self._provider_for(section).agenerate(
+                system_instruction, prompts[section], self.temperature,
+                use_cache=self._use_cache, semaphore=semaphore
+            )
+            return section, text
+        
+        pending = [section for section in prompts if section not in cached]
+        print(f"Generating {len(pending)} sections...")
+        for next_done in asyncio.as_completed([generate_section(section) for section in pending]):
+            section, text = await next_done
+            self._store_semantic(semantic_key, {section: text})
+            yield section, text
+    
+    def stream_section(
+        self,
+        section: str,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> Iterator[str]:
+        """Stream one AI-written section as its text arrives from the provider."""
+        prompt = self._section_prompt(section, primary_kw)
+        context = self._brief_context(client_data, topic, primary_kw, secondary_kws)
+        return self._provider_for(section).stream_generate(
+            self._system_prompt(context), prompt, temperature=self.temperature
+        )
+    
+    def complete_brief(
+        self,
+        brief_sections: Dict[str, str],
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> Dict[str, str]:
+        """Add the client-profile sections and brief metadata to the AI sections."""
+        print("Generating Restrictions...")
+        brief_sections["restrictions"] = self._format_restrictions(client_data)
+        
+        print("Generating Requirements...")
+        brief_sections["requirements"] = self._format_requirements(client_data)
+        
+        # Add metadata
+        brief_sections.update(self.brief_metadata(client_data, topic, primary_kw, secondary_kws))
+        
+        return brief_sections
+    
+    def brief_metadata(
+        self,
+        client_data: Dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> Dict[str, str]:
+        """Get the brief metadata, which is known before any section is generated."""
+        return {
+            "client_name": client_data["client_name"],
+            "topic": topic,
+            "site": client_data["site"],
+            "primary_kw": primary_kw,
+            "secondary_kws": ", ".join(secondary_kws),
+        }
+    
+    def _get_system_instruction(self) -> str:
+        """Get the absolute mode system instruction."""
+        return _SYSTEM_INSTRUCTION
+    
+    def _brief_context(
+        self, client_data: Dict, topic: str, primary_kw: str, secondary_kws: List[str]
+    ) -> str:
+        """Build the brief details shared by every section prompt."""
+        mandatory_mentions = client_data.get('requirements', {}).get('mandatory_mentions', [])
+        return f"""Common Brief Context:
+
+Client (brand): {client_data['client_name']}
+Site: {client_data['site']}
+Topic: {topic}
+Primary keyword: {primary_kw}
+Secondary keywords: {', '.join(secondary_kws)}
+Mandatory mentions: {', '.join(mandatory_mentions)}"""
+    
+    def _system_prompt(self, context: str) -> str:
+        """
+        Combine the system instruction with the shared brief context.
+        
+        Everything identical across a brief's section calls sits in this
+        prefix, so provider-side prompt caching can reuse it; each section's
+        user prompt carries only its own instructions.
+        """
+        return f"{self._get_system_instruction()}\n\n{context}"
+    
+    def _build_section_prompts(self, primary_kw: str) -> Dict[str, str]:
+        """Build the user prompt for every AI-generated section, keyed by section."""
+        return {section: self._section_prompt(section, primary_kw) for section in self.AI_SECTIONS}
+    
+    def _section_prompt(self, section: str, primary_kw: str) -> str:
+        """Build the user prompt for a single AI-generated section."""
+        return _SECTION_TEMPLATES[section].substitute(primary_kw=primary_kw)
+    
+    @staticmethod
+    def _semantic_key(
+        client_data: Dict, topic: str, primary_kw: str, secondary_kws: List[str]
+    ) -> Tuple[str, str]:
+        """
+        Get the (scope, text) a brief is looked up under in the semantic cache.
         
-        return self._call_ai(system_instruction, prompt)
+        Responses are only reused for the same client and primary keyword,
+        which must match exactly; within that scope only the topic and
+        secondary keywords are compared by meaning. The section prompts are
+        fixed text, so embedding them would only make different briefs look alike.
+        """
+        scope = f"{client_data['client_name']}\n{primary_kw.strip().lower()}"
+        return scope, f"{topic}\n{', '.join(secondary_kws)}"
+    
+    def _semantic_hits(self, semantic_key: Tuple[str, str], prompts: Dict[str, str]) -> Dict[str, str]:
+        """Look up each section of a brief in the semantic cache if enabled."""
+        if self.semantic_cache is None:
+            return {}
+        hits = {}
+        for section in prompts:
+            response = self.semantic_cache.get(section, *semantic_key)
+            if response is not None:
+                hits[section] = response
+        return hits
+    
+    def _store_semantic(self, semantic_key: Tuple[str, str], generated: Dict[str, str]):
+        """Store newly generated section responses in the semantic cache if enabled."""
+        if self.semantic_cache is not None:
+            for section, response in generated.items():
+                self.semantic_cache.add(section, *semantic_key, response)
+    
+    def _provider_for(self, section: str) -> AIProvider:
+        """Get the provider a section is routed to."""
+        route = self.routing.get(section)
+        if route is None or route == (self.ai_provider.provider, self.ai_provider.model):
+            return self.ai_provider
+        if route not in self._providers:
+            provider, model = route
+            self._providers[route] = AIProvider(provider, cache=self._cache, model=model)
+        return self._providers[route]
+    
+    def _format_restrictions(self, client_data: Dict) -> str:
+        """Format restrictions from client profile."""
+        restrictions = client_data.get("restrictions", {})
+        return _format_cached(
+            _restrictions_text,
+            tuple(tuple(restrictions.get(key, [])) for _, key in _RESTRICTION_GROUPS)
+        )
+    
+    def _format_requirements(self, client_data: Dict) -> str:
+        """Format requirements from client profile."""
+        reqs = client_data.get("requirements", {})
+        return _format_cached(
+            _requirements_text,
+            reqs.get("word_count"),
+            reqs.get("readability_score"),
+            reqs.get("tone"),
+            tuple(reqs.get("mandatory_mentions") or ()),
+            reqs.get("schema_required"),
+            reqs.get("images_required"),
+            reqs.get("cta_required"),
+            reqs.get("internal_links_min")
+        )
@@ -3,9 +3,51 @@ Client Profile Management System
 Handles creating, reading, updating, and deleting client profiles.
 """
 
+import copy
 import json
 import os
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# orjson speeds up profile reads and writes when installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Maximum number of parsed client profiles kept in memory
+MAX_CACHED_CLIENTS = 64
+
+
+def _json_dumps(data: Dict, pretty: bool = False) -> bytes:
+    """Serialize a profile to UTF-8 JSON bytes, compact unless pretty is set."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option)
+    if pretty:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Dict:
+    """Parse a profile from JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def merge_profile_updates(profile: Dict, updates: Dict) -> Dict:
+    """
+    Apply a partial update to a profile in place and return it.
+    
+    Dict values (restrictions, requirements) are merged key by key into the
+    stored dict; any other value replaces the stored one.
+    """
+    for key, value in updates.items():
+        current = profile.get(key)
+        profile[key] = {**current, **value} if isinstance(value, dict) and isinstance(current, dict) else value
+    return profile
 
 
 class ClientManager:
@@ -14,6 +56,9 @@ class ClientManager:
     def __init__(self, clients_dir: str = "clients"):
         self.clients_dir = clients_dir
         os.makedirs(clients_dir, exist_ok=True)
+        
+        # Parsed profiles keyed by file path, with the file mtime they were read at
+        self._cache: "OrderedDict[str, Tuple[int, Dict]]" = OrderedDict()
     
     def create_client(self, client_name: str, client_data: Dict) -> bool:
         """Create a new client profile."""
@@ -50,22 +95,41 @@ class ClientManager:
         merged_data = {**default_structure, **client_data}
         merged_data["client_name"] = client_name
         
-        with open(client_file, 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, indent=2, ensure_ascii=False)
+        self._atomic_write_json(client_file, merged_data)
+        self._cache.pop(client_file, None)
         
         print(f"Client '{client_name}' created successfully.")
         return True
     
     def get_client(self, client_name: str) -> Optional[Dict]:
-        """Retrieve a client profile."""
+        """
+        Retrieve a client profile.
+        
+        Parsed profiles are cached until their file's mtime changes; callers
+        get a deep copy, so mutating the result never touches the cache.
+        """
         client_file = self._get_client_file(client_name)
         
-        if not os.path.exists(client_file):
+        try:
+            mtime = os.stat(client_file).st_mtime_ns
+        except FileNotFoundError:
+            self._cache.pop(client_file, None)
             print(f"Client '{client_name}' not found.")
             return None
         
-        with open(client_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        cached = self._cache.get(client_file)
+        if cached is not None and cached[0] == mtime:
+            self._cache.move_to_end(client_file)
+            return copy.deepcopy(cached[1])
+        
+        with open(client_file, 'rb') as f:
+            client_data = _json_loads(f.read())
+        
+        self._cache[client_file] = (mtime, client_data)
+        self._cache.move_to_end(client_file)
+        while len(self._cache) > MAX_CACHED_CLIENTS:
+            self._cache.popitem(last=False)
+        return copy.deepcopy(client_data)
     
     def update_client(self, client_name: str, updates: Dict) -> bool:
         """Update an existing client profile."""
@@ -74,16 +138,11 @@ class ClientManager:
         if not client_data:
             return False
         
-        # Deep merge for nested dictionaries
-        for key, value in updates.items():
-            if isinstance(value, dict) and key in client_data:
-                client_data[key].update(value)
-            else:
-                client_data[key] = value
+        merge_profile_updates(client_data, updates)
         
         client_file = self._get_client_file(client_name)
-        with open(client_file, 'w', encoding='utf-8') as f:
-            json.dump(client_data, f, indent=2, ensure_ascii=False)
+        self._atomic_write_json(client_file, client_data)
+        self._cache.pop(client_file, None)
         
         print(f"Client '{client_name}' updated successfully.")
         return True
@@ -97,6 +156,7 @@ class ClientManager:
             return False
         
         os.remove(client_file)
+        self._cache.pop(client_file, None)
         print(f"Client '{client_name}' deleted successfully.")
         return True
     
@@ -105,13 +165,41 @@ class ClientManager:
         if not os.path.exists(self.clients_dir):
             return []
         
-        clients = []
-        for file in os.listdir(self.clients_dir):
-            if file.endswith('.json'):
-                clients.append(file[:-5])  # Remove .json extension
+        with os.scandir(self.clients_dir) as entries:
+            clients = [
+                entry.name[:-5]  # Remove .json extension
+                for entry in entries
+                if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False)
+            ]
         
         return sorted(clients)
     
+    def export_client(self, client_name: str, export_path: str) -> bool:
+        """Write a client profile to export_path as indented, human-readable JSON."""
+        client_data = self.get_client(client_name)
+        
+        if not client_data:
+            return False
+        
+        self._atomic_write_json(export_path, client_data, pretty=True)
+        print(f"Client '{client_name}' exported to {export_path}.")
+        return True
+    
+    @staticmethod
+    def _atomic_write_json(path: str, data: Dict, pretty: bool = False):
+        """
+        Write JSON to a temporary file, then move it over path.
+        
+        os.replace is atomic, so a crash mid-write leaves the previous file
+        intact instead of a truncated profile.
+        """
+        payload = _json_dumps(data, pretty)
+        
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    
     def _get_client_file(self, client_name: str) -> str:
         """Get the file path for a client."""
         safe_name = client_name.replace(' ', '_').lower()
@@ -3,164 +3,415 @@ Document Formatter
 Creates formatted Word documents from content brief data.
 """
 
-from docx import Document
-from docx.shared import Pt, RGBColor, Inches
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml.shared import OxmlElement
-from docx.oxml.ns import qn
-from typing import Dict
-import os
+from copy import deepcopy
+import io
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, AsyncIterator, Dict, Iterable, List, Set, Tuple
+from xml.sax.saxutils import escape
 from datetime import datetime
 
+# python-docx is slow to import, so it is only imported once a document is built
+if TYPE_CHECKING:
+    from docx.document import Document
+
+# An RGB color as (red, green, blue), each 0-255
+Color = Tuple[int, int, int]
+
+# Lengths in python-docx are EMUs; table widths in the XML are twips
+EMU_PER_TWIP = 635
+
+# WordprocessingML namespace declaration for standalone XML fragments
+_W_NAMESPACE = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+# Control characters XML 1.0 can't represent, even escaped; AI output
+# occasionally contains them and lxml rejects the whole document if it does
+_XML_ILLEGAL_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Body-level XML (tables, paragraphs) is parsed inside this wrapper, which
+# declares the namespace once for every block in it
+_BODY_XML = '<w:body ' + _W_NAMESPACE + '>{blocks}</w:body>'
+
+# Empty paragraph used for spacing after each table
+_SPACING_XML = '<w:p/>'
+
+# Paragraph styles added to every document, so runs inherit their formatting
+# instead of each carrying its own; python-docx derives a style's id from its
+# name by dropping the spaces
+TITLE_STYLE = "Brief Title"
+SECTION_TITLE_STYLE = "Brief Section Title"
+BODY_STYLE = "Brief Body"
+LABEL_STYLE = "Brief Label"
+
+# A paragraph of text in one of the styles above
+_STYLED_PARAGRAPH_XML = (
+    '<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+    '<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+)
+
+# A two-row section table (title row, content row), laid out like
+# doc.add_table(rows=2, cols=1) with the 'Table Grid' style
+_SECTION_TABLE_XML = (
+    '<w:tbl>'
+    '<w:tblPr><w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+    ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+    '<w:tblGrid><w:gridCol w:w="{width}"/></w:tblGrid>'
+    '<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="{title_fill}"/></w:tcPr>'
+    '{title}</w:tc></w:tr>'
+    '<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="{content_fill}"/></w:tcPr>'
+    '{paragraphs}</w:tc></w:tr>'
+    '</w:tbl>'
+)
+
+
+# Header title table: one centred, shaded cell across the text width
+_HEADER_TITLE_XML = (
+    '<w:tbl>'
+    '<w:tblPr><w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+    ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+    '<w:tblGrid><w:gridCol w:w="{width}"/></w:tblGrid>'
+    '<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/></w:tcPr>'
+    '{title}</w:tc></w:tr>'
+    '</w:tbl>'
+)
+
+# Header info table (label, value) and one of its rows
+_INFO_TABLE_XML = (
+    '<w:tbl>'
+    '<w:tblPr><w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0"'
+    ' w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>'
+    '<w:tblGrid><w:gridCol w:w="{label_width}"/><w:gridCol w:w="{value_width}"/></w:tblGrid>'
+    '{rows}</w:tbl>'
+)
+_INFO_ROW_XML = (
+    '<w:tr><w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{label_width}"/>'
+    '<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/></w:tcPr>'
+    '{label}</w:tc>'
+    '<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{value_width}"/></w:tcPr>'
+    '<w:p><w:r><w:t xml:space="preserve">{value}</w:t></w:r></w:p></w:tc></w:tr>'
+)
+
+# Info table column widths in twips (1.5 and 5.0 inches)
+INFO_LABEL_WIDTH = 2160
+INFO_VALUE_WIDTH = 7200
+
+
+def _style_id(style_name: str) -> str:
+    """Get the id python-docx gives a style added under style_name."""
+    return style_name.replace(" ", "")
+
+
+def _xml_text(text: str) -> str:
+    """Escape text for use in an XML string, dropping characters XML can't hold."""
+    return escape(_XML_ILLEGAL_CHARS.sub("", text))
+
+
+def _styled_paragraph(style_name: str, text: str) -> str:
+    """Build the XML for a paragraph of text in one of the brief's styles."""
+    return _STYLED_PARAGRAPH_XML.format(style_id=_style_id(style_name), text=_xml_text(text))
+
+
+# A section content paragraph split around its text, so each line is a concatenation
+_BODY_PARAGRAPH_START, _BODY_PARAGRAPH_END = _STYLED_PARAGRAPH_XML.format(
+    style_id=_style_id(BODY_STYLE), text="\0"
+).split("\0")
+
+
+@lru_cache(maxsize=16)
+def _hex_color(color: Color) -> str:
+    """Get the RRGGBB hex string Word uses for a color."""
+    return bytes(color).hex().upper()
+
+
+def _parse_xml(xml: str):
+    """Parse a WordprocessingML fragment into python-docx's element classes."""
+    from docx.oxml import parse_xml
+    return parse_xml(xml)
+
+
+def _parse_blocks(xml: str) -> List:
+    """Parse a run of body-level XML elements with a single parse."""
+    return list(_parse_xml(_BODY_XML.format(blocks=xml)))
+
 
 class DocumentFormatter:
     """Formats content briefs into Word documents with consistent styling."""
     
+    # Brief sections in document order, with their headings
+    SECTIONS = (
+        ("page_type", "1. Page Type Identification"),
+        ("page_title", "2. Page Title"),
+        ("meta_description", "3. Meta Description"),
+        ("target_url", "4. Target URL"),
+        ("h1", "5. H1 Heading"),
+        ("summary_bullets", "6. Summary Bullets"),
+        ("internal_links", "7. Internal Linking"),
+        ("audience", "8. Audience Definition"),
+        ("cta", "9. CTA / Path"),
+        ("restrictions", "10. Restrictions"),
+        ("requirements", "11. Requirements"),
+        ("headings_faq", "12. Suggested Headings & Key Points (+ FAQ)"),
+    )
+    
     def __init__(self):
         self.font_name = "Calibri"
         self.body_size = 11
         self.heading_size = 12
         
         # Professional color scheme
-        self.header_bg = RGBColor(0, 32, 96)  # Dark blue
-        self.header_text = RGBColor(255, 255, 255)  # White
-        self.section_bg = RGBColor(68, 114, 196)  # Medium blue
-        self.section_text = RGBColor(255, 255, 255)  # White
-        self.content_bg = RGBColor(242, 242, 242)  # Light gray
-        self.content_text = RGBColor(0, 0, 0)  # Black
+        self.header_bg = (0, 32, 96)  # Dark blue
+        self.header_text = (255, 255, 255)  # White
+        self.section_bg = (68, 114, 196)  # Medium blue
+        self.section_text = (255, 255, 255)  # White
+        self.content_bg = (242, 242, 242)  # Light gray
+        self.content_text = (0, 0, 0)  # Black
+        
+        # Output directories already created by this formatter
+        self._created_dirs: Set[str] = set()
     
     def create_brief_document(self, brief_data: Dict, output_dir: str = "output_briefs") -> str:
         """Create a formatted Word document from brief data."""
+        return self.save_document(self._build_document(brief_data), brief_data, output_dir)
+    
+    def save_document(self, doc: "Document", brief_data: Dict, output_dir: str = "output_briefs") -> str:
+        """Save a built document under a timestamped filename and return its path."""
+        if output_dir not in self._created_dirs:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(output_dir)
         
-        doc = Document()
-        
-        # Set default font for the document
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = self.font_name
-        font.size = Pt(self.body_size)
-        
-        # Header
-        self._add_header(doc, brief_data)
-        
-        # Add each section
-        self._add_section(doc, "1. Page Type Identification", brief_data.get("page_type", ""))
-        self._add_section(doc, "2. Page Title", brief_data.get("page_title", ""))
-        self._add_section(doc, "3. Meta Description", brief_data.get("meta_description", ""))
-        self._add_section(doc, "4. Target URL", brief_data.get("target_url", ""))
-        self._add_section(doc, "5. H1 Heading", brief_data.get("h1", ""))
-        self._add_section(doc, "6. Summary Bullets", brief_data.get("summary_bullets", ""))
-        self._add_section(doc, "7. Internal Linking", brief_data.get("internal_links", ""))
-        self._add_section(doc, "8. Audience Definition", brief_data.get("audience", ""))
-        self._add_section(doc, "9. CTA / Path", brief_data.get("cta", ""))
-        self._add_section(doc, "10. Restrictions", brief_data.get("restrictions", ""))
-        self._add_section(doc, "11. Requirements", brief_data.get("requirements", ""))
-        self._add_section(doc, "12. Suggested Headings & Key Points (+ FAQ)", brief_data.get("headings_faq", ""))
-        
-        # Save the document
-        os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         client_name = brief_data.get("client_name", "Client").replace(" ", "_")
         topic = brief_data.get("topic", "Topic").replace(" ", "_")[:30]  # Limit length
         
-        filename = f"{client_name}_{topic}_{timestamp}.docx"
-        filepath = os.path.join(output_dir, filename)
+        filepath = Path(output_dir) / f"{client_name}_{topic}_{timestamp}.docx"
         
-        doc.save(filepath)
+        # Zip in memory, write once, then move into place, so a crash
+        # never leaves a half-written .docx behind
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        tmp_path = filepath.with_name(filepath.name + ".tmp")
+        tmp_path.write_bytes(buffer.getbuffer())
+        tmp_path.replace(filepath)
         
-        return filepath
+        return str(filepath)
     
-    def _add_header(self, doc: Document, brief_data: Dict):
-        """Add professional table-based header with client information."""
+    def write_brief_document(self, brief_data: Dict, stream: IO[bytes]):
+        """Write a formatted Word document from brief data to a binary stream."""
+        self._build_document(brief_data).save(stream)
+    
+    def new_document(self, brief_data: Dict) -> "Document":
+        """Start a styled document with its header; only the brief metadata is needed."""
+        doc = self._styled_document()
         
-        # Main title with colored background
-        title_table = doc.add_table(rows=1, cols=1)
-        title_table.style = 'Table Grid'
-        title_cell = title_table.rows[0].cells[0]
-        title_cell.text = f"{brief_data.get('client_name', '')} - {brief_data.get('topic', '')} - Content Brief"
+        # Header
+        self._add_header(doc, brief_data)
         
-        # Style title cell
-        title_para = title_cell.paragraphs[0]
-        title_run = title_para.runs[0]
-        title_run.font.name = self.font_name
-        title_run.font.size = Pt(16)
-        title_run.font.bold = True
-        title_run.font.color.rgb = self.header_text
-        title_para.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+        return doc
+    
+    def _styled_document(self) -> "Document":
+        """Create an empty document with the brief's fonts and paragraph styles."""
+        from docx import Document
+        from docx.shared import Pt
+        
+        doc = Document()
         
-        # Set title cell background color
-        self._set_cell_background(title_cell, self.header_bg)
+        # Set default font for the document
+        style = doc.styles['Normal']
+        font = style.font
+        font.name = self.font_name
+        font.size = Pt(self.body_size)
+        self._add_styles(doc)
         
-        doc.add_paragraph()  # Spacing
+        return doc
+    
+    async def stream_sections(
+        self, doc: "Document", sections: AsyncIterator[Tuple[str, str]]
+    ) -> Dict[str, str]:
+        """
+        Add sections to a document as they arrive, keeping document order.
         
-        # Info table with metadata
-        info_table = doc.add_table(rows=4, cols=2)
-        info_table.style = 'Table Grid'
+        Sections that arrive early are held until every section before them
+        has been written. Returns all received section texts.
+        """
+        received = {}
+        next_index = 0
         
-        # Set column widths
-        info_table.columns[0].width = Inches(1.5)
-        info_table.columns[1].width = Inches(5.0)
+        async for key, content in sections:
+            received[key] = content
+            while next_index < len(self.SECTIONS) and self.SECTIONS[next_index][0] in received:
+                section_key, section_title = self.SECTIONS[next_index]
+                self._add_section(doc, section_title, received[section_key])
+                next_index += 1
         
-        # Row 1: Site
-        self._add_info_row(info_table.rows[0], "Site:", brief_data.get('site', ''))
+        # Sections that never arrived are written empty
+        for section_key, section_title in self.SECTIONS[next_index:]:
+            self._add_section(doc, section_title, received.get(section_key, ""))
         
-        # Row 2: Primary Keyword
-        self._add_info_row(info_table.rows[1], "Primary Keyword:", brief_data.get('primary_kw', ''))
+        return received
+    
+    def _build_document(self, brief_data: Dict) -> "Document":
+        """Build the formatted Word document for a brief."""
         
-        # Row 3: Secondary Keywords
-        self._add_info_row(info_table.rows[2], "Secondary Keywords:", brief_data.get('secondary_kws', ''))
+        doc = self._styled_document()
         
-        # Row 4: Date Generated
-        self._add_info_row(info_table.rows[3], "Date Generated:", datetime.now().strftime("%d %B %Y"))
+        # Build the header's and every section's XML, then parse it and
+        # insert it into the body in one pass
+        style_id, width = self._table_layout(doc)
+        xml_parts = [self._header_xml(brief_data, style_id, width)]
+        xml_parts.extend(
+            self._section_xml(section_title, brief_data.get(section_key, ""), style_id, width)
+            for section_key, section_title in self.SECTIONS
+        )
+        self._insert_blocks(doc, _parse_blocks("".join(xml_parts)))
         
-        # Add spacing
-        doc.add_paragraph()
+        return doc
     
-    def _add_section(self, doc: Document, section_title: str, content: str):
-        """Add a professional section with table-based layout."""
+    def _add_header(self, doc: "Document", brief_data: Dict):
+        """Add professional table-based header with client information."""
+        self._insert_blocks(doc, _parse_blocks(self._header_xml(brief_data, *self._table_layout(doc))))
+    
+    def _header_xml(self, brief_data: Dict, style_id: str, width: int) -> str:
+        """Build the XML for the title table, the info table and the spacing after each."""
         
-        # Create section table
-        section_table = doc.add_table(rows=2, cols=1)
-        section_table.style = 'Table Grid'
+        # Main title with colored background
+        title = f"{brief_data.get('client_name', '')} - {brief_data.get('topic', '')} - Content Brief"
+        title_table = _HEADER_TITLE_XML.format(
+            style_id=style_id,
+            width=width,
+            fill=_hex_color(self.header_bg),
+            title=_styled_paragraph(TITLE_STYLE, title)
+        )
         
-        # Title row with colored background
-        title_cell = section_table.rows[0].cells[0]
-        title_cell.text = section_title
+        # Info table with metadata
+        rows = "".join(
+            _INFO_ROW_XML.format(
+                label_width=INFO_LABEL_WIDTH,
+                value_width=INFO_VALUE_WIDTH,
+                fill=_hex_color(self.content_bg),
+                label=_styled_paragraph(LABEL_STYLE, label),
+                value=_xml_text(value)
+            )
+            for label, value in (
+                ("Site:", brief_data.get('site', '')),
+                ("Primary Keyword:", brief_data.get('primary_kw', '')),
+                ("Secondary Keywords:", brief_data.get('secondary_kws', '')),
+                ("Date Generated:", datetime.now().strftime("%d %B %Y")),
+            )
+        )
+        info_table = _INFO_TABLE_XML.format(
+            style_id=style_id,
+            label_width=INFO_LABEL_WIDTH,
+            value_width=INFO_VALUE_WIDTH,
+            rows=rows
+        )
         
-        # Style title
-        title_para = title_cell.paragraphs[0]
-        title_run = title_para.runs[0]
-        title_run.font.name = self.font_name
-        title_run.font.size = Pt(self.heading_size)
-        title_run.font.bold = True
-        title_run.font.color.rgb = self.section_text
+        return title_table + _SPACING_XML + info_table + _SPACING_XML
+    
+    def _add_section(self, doc: "Document", section_title: str, content: str):
+        """Add a professional section with table-based layout."""
+        self._insert_blocks(doc, _parse_blocks(self._section_xml(section_title, content, *self._table_layout(doc))))
+    
+    def add_section_stream(self, doc: "Document", section_title: str, chunks: Iterable[str]) -> str:
+        """
+        Add a section whose content is written into its table as the chunks arrive.
         
-        # Set title cell background
-        self._set_cell_background(title_cell, self.section_bg)
+        Each newline in the text starts a new paragraph; carriage returns are
+        dropped, so CRLF text (even with the pair split across two chunks)
+        reads the same as in a bulk-built section. Returns the full section text.
+        """
+        blocks = _parse_blocks(self._section_xml(section_title, "", *self._table_layout(doc)))
+        self._insert_blocks(doc, blocks)
         
-        # Content row with light background
-        content_cell = section_table.rows[1].cells[0]
+        content_cell = blocks[0].tr_lst[-1].tc_lst[0]
+        body_style_id = _style_id(BODY_STYLE)
+        paragraph = content_cell.p_lst[-1]
+        paragraph.style = body_style_id
         
-        # Set content cell background
-        self._set_cell_background(content_cell, self.content_bg)
+        # Run parsed once; each piece of text gets a copy
+        run_template = _parse_xml(f'<w:r {_W_NAMESPACE}><w:t xml:space="preserve"/></w:r>')
+        parts = []
         
-        # Add content with proper formatting
-        content_cell.text = ''  # Clear default text
-        content_lines = content.split('\n')
+        for chunk in chunks:
+            parts.append(chunk)
+            for index, text in enumerate(chunk.replace('\r', '').split('\n')):
+                if index:
+                    paragraph = content_cell.add_p()
+                    paragraph.style = body_style_id
+                if text:
+                    run = deepcopy(run_template)
+                    run[-1].text = _XML_ILLEGAL_CHARS.sub("", text)
+                    paragraph.append(run)
         
-        for i, line in enumerate(content_lines):
-            if i > 0:  # Add paragraph for subsequent lines
-                content_cell.add_paragraph()
-            
+        return "".join(parts)
+    
+    def _table_layout(self, doc: "Document") -> Tuple[str, int]:
+        """Get the 'Table Grid' style id and the full text width in twips."""
+        section = doc.sections[-1]
+        width = section.page_width - section.left_margin - section.right_margin
+        return doc.styles['Table Grid'].style_id, width // EMU_PER_TWIP
+    
+    def _section_xml(self, section_title: str, content: str, style_id: str, width: int) -> str:
+        """Build the XML for a section's table and the spacing paragraph after it."""
+        # Escape the content in one pass; escaping never touches whitespace or
+        # line breaks, so the lines and blank-line checks are unaffected.
+        # splitlines() also breaks on \r\n and the other line separators, and
+        # an empty section still needs one paragraph in its cell. A run of
+        # blank lines becomes a single empty paragraph
+        paragraphs = []
+        previous_blank = False
+        for line in _xml_text(content).splitlines() or ['']:
             if line.strip():
-                para = content_cell.paragraphs[-1]
-                run = para.add_run(line)
-                run.font.name = self.font_name
-                run.font.size = Pt(self.body_size)
-                run.font.color.rgb = self.content_text
+                paragraphs.append(_BODY_PARAGRAPH_START + line + _BODY_PARAGRAPH_END)
+                previous_blank = False
+            elif not previous_blank:
+                paragraphs.append('<w:p/>')
+                previous_blank = True
+        table = _SECTION_TABLE_XML.format(
+            style_id=style_id,
+            width=width,
+            title_fill=_hex_color(self.section_bg),
+            title=_styled_paragraph(SECTION_TITLE_STYLE, section_title),
+            content_fill=_hex_color(self.content_bg),
+            paragraphs="".join(paragraphs)
+        )
+        return table + _SPACING_XML
+    
+    def _add_styles(self, doc: "Document"):
+        """Add the brief's paragraph styles, each based on the document's Normal style."""
+        from docx.enum.style import WD_STYLE_TYPE
+        from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+        from docx.shared import Pt, RGBColor
+        
+        for style_name, size, color, bold in (
+            (TITLE_STYLE, 16, self.header_text, True),
+            (SECTION_TITLE_STYLE, self.heading_size, self.section_text, True),
+            (BODY_STYLE, None, self.content_text, False),
+            (LABEL_STYLE, None, None, True),
+        ):
+            style = doc.styles.add_style(style_name, WD_STYLE_TYPE.PARAGRAPH)
+            style.base_style = doc.styles['Normal']
+            if size is not None:
+                style.font.size = Pt(size)
+            if color is not None:
+                style.font.color.rgb = RGBColor(*color)
+            style.font.bold = bold or None
         
-        # Add spacing after section
-        doc.add_paragraph()
+        doc.styles[TITLE_STYLE].paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+    
+    @staticmethod
+    def _insert_blocks(doc: "Document", blocks: List):
+        """Insert block elements at the end of the body, ahead of its section properties."""
+        body = doc.element.body
+        sect_pr = body.sectPr
+        index = body.index(sect_pr) if sect_pr is not None else len(body)
+        body[index:index] = blocks
     
     def set_font(self, font_name: str):
         """Change the font name."""
@@ -173,27 +424,3 @@ class DocumentFormatter:
     def set_heading_size(self, size: int):
         """Change the heading font size."""
         self.heading_size = size
-    
-    def _set_cell_background(self, cell, color: RGBColor):
-        """Set background color for a table cell."""
-        shading_elm = OxmlElement('w:shd')
-        shading_elm.set(qn('w:fill'), '{:02X}{:02X}{:02X}'.format(color.r, color.g, color.b))
-        cell._element.get_or_add_tcPr().append(shading_elm)
-    
-    def _add_info_row(self, row, label: str, value: str):
-        """Add a formatted info row to the header table."""
-        # Label cell
-        label_cell = row.cells[0]
-        label_para = label_cell.paragraphs[0]
-        label_run = label_para.add_run(label)
-        label_run.font.name = self.font_name
-        label_run.font.size = Pt(self.body_size)
-        label_run.font.bold = True
-        self._set_cell_background(label_cell, self.content_bg)
-        
-        # Value cell
-        value_cell = row.cells[1]
-        value_para = value_cell.paragraphs[0]
-        value_run = value_para.add_run(value)
-        value_run.font.name = self.font_name
-        value_run.font.size = Pt(self.body_size)
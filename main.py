@@ -3,13 +3,19 @@ Content Brief Creator - Main Interface
 Interactive CLI for creating content briefs using client profiles.
 """
 
+import asyncio
 import sys
-from typing import List
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Tuple
 from client_manager import ClientManager
 from brief_generator import BriefGenerator
 from document_formatter import DocumentFormatter
 from ai_provider import AIProvider
 
+# Worker processes for batch generation; each runs up to MAX_CONCURRENCY provider calls
+BATCH_MAX_WORKERS = 2
+
 
 class ContentBriefCreator:
     """Main application interface for content brief creation."""
@@ -18,9 +24,12 @@ class ContentBriefCreator:
         self.client_manager = ClientManager()
         self.doc_formatter = DocumentFormatter()
         
-        # Check for available AI providers
-        available_providers = AIProvider.list_available_providers()
-        if not available_providers:
+        # Background thread for loading data while the user is still typing
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        
+        # Check for available AI providers; configuration doesn't change during a session
+        self.available_providers = AIProvider.list_available_providers()
+        if not self.available_providers:
             print("Error: No AI provider API keys found.")
             print("\nPlease set up at least one AI provider API key:")
             print("1. Copy .env.example to .env")
@@ -36,20 +45,23 @@ class ContentBriefCreator:
         while True:
             print("\nMain Menu:")
             print("1. Create Brief")
-            print("2. Manage Clients")
-            print("3. Exit")
+            print("2. Create Briefs in Batch")
+            print("3. Manage Clients")
+            print("4. Exit")
             
-            choice = input("\nEnter choice (1-3): ").strip()
+            choice = self._ask("\nEnter choice (1-4): ")
             
             if choice == "1":
                 self.create_brief_workflow()
             elif choice == "2":
-                self.manage_clients_workflow()
+                self.create_briefs_batch_workflow()
             elif choice == "3":
+                self.manage_clients_workflow()
+            elif choice == "4":
                 print("\nExiting...")
                 break
             else:
-                print("Invalid choice. Please enter 1, 2, or 3.")
+                print("Invalid choice. Please enter 1, 2, 3, or 4.")
     
     def create_brief_workflow(self):
         """Workflow for creating a new content brief."""
@@ -57,22 +69,22 @@ class ContentBriefCreator:
         print("Create Content Brief")
         print("-"*60)
         
+        # List the clients while the user picks a provider
+        clients_future = self._executor.submit(self.client_manager.list_clients)
+        
         # Select AI provider
-        available_providers = AIProvider.list_available_providers()
+        available_providers = self.available_providers
         print("\nAvailable AI providers:")
         for idx, provider in enumerate(available_providers, 1):
             print(f"{idx}. {provider.upper()}")
         
-        try:
-            provider_idx = int(input("\nSelect AI provider (or press Enter for default): ").strip() or "1") - 1
-            if provider_idx < 0 or provider_idx >= len(available_providers):
-                print("Invalid selection. Using default provider.")
-                selected_provider = available_providers[0]
-            else:
-                selected_provider = available_providers[provider_idx]
-        except ValueError:
-            print("Invalid input. Using default provider.")
-            selected_provider = available_providers[0]
+        provider_idx = self._ask_index(
+            "\nSelect AI provider (or press Enter for default): ", len(available_providers), default=0
+        )
+        if provider_idx is None:
+            print("Invalid selection. Using default provider.")
+            provider_idx = 0
+        selected_provider = available_providers[provider_idx]
         
         print(f"Using AI provider: {selected_provider.upper()}")
         
@@ -83,8 +95,7 @@ class ContentBriefCreator:
             print(f"Error initializing AI provider: {e}")
             return
         
-        # List available clients
-        clients = self.client_manager.list_clients()
+        clients = clients_future.result()
         
         if not clients:
             print("\nNo clients found. Please create a client first.")
@@ -95,62 +106,56 @@ class ContentBriefCreator:
             print(f"{idx}. {client}")
         
         # Select client
-        try:
-            client_idx = int(input("\nSelect client number: ").strip()) - 1
-            if client_idx < 0 or client_idx >= len(clients):
-                print("Invalid selection.")
-                return
-            
-            selected_client = clients[client_idx]
-        except ValueError:
-            print("Invalid input. Please enter a number.")
-            return
-        
-        # Get client data
-        client_data = self.client_manager.get_client(selected_client)
-        if not client_data:
+        client_idx = self._ask_index("\nSelect client number: ", len(clients))
+        if client_idx is None:
+            print("Invalid selection.")
             return
         
-        print(f"\nClient: {client_data['client_name']}")
-        print(f"Site: {client_data['site']}")
+        # Load only the chosen profile, while the user types the brief details
+        selected_client = clients[client_idx]
+        client_future = self._executor.submit(self.client_manager.get_client, selected_client)
+        print(f"\nClient: {selected_client}")
         
         # Get topic and keywords
         print("\nBrief Details:")
-        topic = input("Topic: ").strip()
+        topic = self._ask("Topic: ", required="Topic is required.")
         if not topic:
-            print("Topic is required.")
             return
         
-        primary_kw = input("Primary keyword: ").strip()
+        primary_kw = self._ask("Primary keyword: ", required="Primary keyword is required.")
         if not primary_kw:
-            print("Primary keyword is required.")
             return
         
-        secondary_kws_input = input("Secondary keywords (comma-separated): ").strip()
+        secondary_kws_input = self._ask("Secondary keywords (comma-separated): ")
         secondary_kws = [kw.strip() for kw in secondary_kws_input.split(',') if kw.strip()]
         
         if not secondary_kws:
             print("At least one secondary keyword is required.")
             return
         
+        stream_output = self._ask("Show sections live as they are written? (y/N): ").lower() == "y"
+        
+        client_data = self._load_profile(selected_client, client_future)
+        if client_data is None:
+            return
+        print(f"Site: {client_data.get('site', '')}")
+        
         # Generate brief
         print("\n" + "="*60)
         print(f"Generating content brief with {selected_provider.upper()}...")
         print("="*60)
         
         try:
-            brief_data = brief_generator.generate_brief(
-                client_data=client_data,
-                topic=topic,
-                primary_kw=primary_kw,
-                secondary_kws=secondary_kws
-            )
-            
-            print("\nBrief generated successfully!")
-            
-            # Create document
-            print("\nCreating Word document...")
-            filepath = self.doc_formatter.create_brief_document(brief_data)
+            if stream_output:
+                # One section at a time, printed and written as its text arrives
+                filepath = self._stream_brief_document(
+                    brief_generator, client_data, topic, primary_kw, secondary_kws
+                )
+            else:
+                # Sections go into the Word document as they are generated
+                filepath = asyncio.run(self._generate_brief_document(
+                    brief_generator, client_data, topic, primary_kw, secondary_kws
+                ))
             
             print(f"\n✓ Brief created successfully!")
             print(f"File saved to: {filepath}")
@@ -160,6 +165,55 @@ class ContentBriefCreator:
             import traceback
             traceback.print_exc()
     
+    async def _generate_brief_document(
+        self,
+        brief_generator: BriefGenerator,
+        client_data: dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> str:
+        """Generate a brief, writing each section into the Word document as it arrives."""
+        metadata = brief_generator.brief_metadata(client_data, topic, primary_kw, secondary_kws)
+        doc = self.doc_formatter.new_document(metadata)
+        await self.doc_formatter.stream_sections(
+            doc,
+            brief_generator.iter_sections_async(client_data, topic, primary_kw, secondary_kws)
+        )
+        return self.doc_formatter.save_document(doc, metadata)
+    
+    def _stream_brief_document(
+        self,
+        brief_generator: BriefGenerator,
+        client_data: dict,
+        topic: str,
+        primary_kw: str,
+        secondary_kws: List[str]
+    ) -> str:
+        """Generate a brief in document order, printing and writing each section's text as it arrives."""
+        brief_data = brief_generator.complete_brief({}, client_data, topic, primary_kw, secondary_kws)
+        doc = self.doc_formatter.new_document(brief_data)
+        
+        for section_key, section_title in self.doc_formatter.SECTIONS:
+            print(f"\n{section_title}\n")
+            if section_key in brief_generator.AI_SECTIONS:
+                chunks = brief_generator.stream_section(
+                    section_key, client_data, topic, primary_kw, secondary_kws
+                )
+            else:
+                chunks = [brief_data[section_key]]
+            self.doc_formatter.add_section_stream(doc, section_title, self._echo(chunks))
+            print()
+        
+        return self.doc_formatter.save_document(doc, brief_data)
+    
+    @staticmethod
+    def _echo(chunks: Iterable[str]) -> Iterator[str]:
+        """Print chunks to the terminal as they pass through."""
+        for chunk in chunks:
+            print(chunk, end="", flush=True)
+            yield chunk
+    
     def manage_clients_workflow(self):
         """Workflow for managing client profiles."""
         print("\n" + "-"*60)
@@ -175,7 +229,7 @@ class ContentBriefCreator:
             print("5. Delete Client")
             print("6. Back to Main Menu")
             
-            choice = input("\nEnter choice (1-6): ").strip()
+            choice = self._ask("\nEnter choice (1-6): ")
             
             if choice == "1":
                 self.list_clients()
@@ -210,12 +264,11 @@ class ContentBriefCreator:
         print("Create New Client")
         print("-"*40)
         
-        client_name = input("Client name: ").strip()
+        client_name = self._ask("Client name: ", required="Client name is required.")
         if not client_name:
-            print("Client name is required.")
             return
         
-        site = input("Website URL: ").strip()
+        site = self._ask("Website URL: ")
         
         print("\nRestrictions:")
         legal = self._get_list_input("Legal restrictions")
@@ -224,8 +277,8 @@ class ContentBriefCreator:
         content = self._get_list_input("Content integrity restrictions")
         
         print("\nRequirements:")
-        word_count = input("Word count range (e.g., 800-1200): ").strip()
-        tone = input("Tone (e.g., Professional, friendly): ").strip()
+        word_count = self._ask("Word count range (e.g., 800-1200): ")
+        tone = self._ask("Tone (e.g., Professional, friendly): ")
         mandatory = self._get_list_input("Mandatory mentions")
         
         client_data = {
@@ -262,21 +315,17 @@ class ContentBriefCreator:
         for idx, client in enumerate(clients, 1):
             print(f"{idx}. {client}")
         
-        try:
-            client_idx = int(input("\nSelect client number: ").strip()) - 1
-            if client_idx < 0 or client_idx >= len(clients):
-                print("Invalid selection.")
-                return
-            
-            selected_client = clients[client_idx]
-            client_data = self.client_manager.get_client(selected_client)
-            
-            if client_data:
-                import json
-                print("\n" + json.dumps(client_data, indent=2))
+        client_idx = self._ask_index("\nSelect client number: ", len(clients))
+        if client_idx is None:
+            print("Invalid selection.")
+            return
+        
+        client_data = self._load_profile(clients[client_idx])
+        if client_data is None:
+            return
         
-        except ValueError:
-            print("Invalid input.")
+        import json
+        print("\n" + json.dumps(client_data, indent=2))
     
     def update_client(self):
         """Update a client's information."""
@@ -295,33 +344,185 @@ class ContentBriefCreator:
         for idx, client in enumerate(clients, 1):
             print(f"{idx}. {client}")
         
-        try:
-            client_idx = int(input("\nSelect client number to delete: ").strip()) - 1
-            if client_idx < 0 or client_idx >= len(clients):
+        client_idx = self._ask_index("\nSelect client number to delete: ", len(clients))
+        if client_idx is None:
+            print("Invalid selection.")
+            return
+        
+        selected_client = clients[client_idx]
+        
+        confirm = self._ask(f"\nAre you sure you want to delete '{selected_client}'? (yes/no): ").lower()
+        if confirm == "yes":
+            self.client_manager.delete_client(selected_client)
+    
+    def create_briefs_batch_workflow(self):
+        """Workflow for generating several content briefs in parallel."""
+        print("\n" + "-"*60)
+        print("Create Briefs in Batch")
+        print("-"*60)
+        
+        clients = self.client_manager.list_clients()
+        if not clients:
+            print("\nNo clients found. Please create a client first.")
+            return
+        
+        print("\nAvailable clients:")
+        for idx, client in enumerate(clients, 1):
+            print(f"{idx}. {client}")
+        
+        # Collect jobs until an empty client number is entered
+        jobs = []
+        while True:
+            print(f"\nBrief {len(jobs) + 1}:")
+            client_idx = self._ask_index("Client number (or press Enter to finish): ", len(clients), default=-1)
+            if client_idx == -1:
+                break
+            if client_idx is None:
                 print("Invalid selection.")
-                return
+                continue
             
-            selected_client = clients[client_idx]
+            topic = self._ask("Topic: ", required="Topic is required.")
+            primary_kw = self._ask("Primary keyword: ", required="Primary keyword is required.")
+            secondary_kws_input = self._ask("Secondary keywords (comma-separated): ")
+            secondary_kws = [kw.strip() for kw in secondary_kws_input.split(',') if kw.strip()]
+            if not topic or not primary_kw:
+                continue
+            if not secondary_kws:
+                print("At least one secondary keyword is required.")
+                continue
             
-            confirm = input(f"\nAre you sure you want to delete '{selected_client}'? (yes/no): ").strip().lower()
-            if confirm == "yes":
-                self.client_manager.delete_client(selected_client)
+            jobs.append((clients[client_idx], topic, primary_kw, secondary_kws))
+        
+        if not jobs:
+            print("\nNo briefs to generate.")
+            return
+        
+        selected_provider = self.available_providers[0]
+        print("\n" + "="*60)
+        print(f"Generating {len(jobs)} content briefs with {selected_provider.upper()}...")
+        print("="*60)
+        
+        filepaths = generate_briefs_batch(jobs, provider=selected_provider, client_manager=self.client_manager)
         
-        except ValueError:
-            print("Invalid input.")
+        print()
+        for (client_name, topic, *_), filepath in zip(jobs, filepaths):
+            if filepath:
+                print(f"✓ {client_name} / {topic}: {filepath}")
+            else:
+                print(f"✗ {client_name} / {topic}: failed")
+    
+    def _load_profile(self, client_name: str, future: Optional[Future] = None) -> Optional[dict]:
+        """
+        Load a client profile, or wait for a background load of it, and check it is usable.
+        
+        A profile without a client_name gets the name it is listed under; one
+        that can't be read is reported and None is returned, so a single bad
+        file only affects that client.
+        """
+        try:
+            client_data = future.result() if future is not None else self.client_manager.get_client(client_name)
+        except (OSError, ValueError) as e:
+            print(f"Could not load client '{client_name}': {e}")
+            return None
+        if client_data is None:
+            return None
+        if not isinstance(client_data, dict):
+            print(f"Could not load client '{client_name}': profile is not a JSON object")
+            return None
+        client_data.setdefault('client_name', client_name)
+        return client_data
+    
+    @staticmethod
+    def _ask(prompt: str, required: Optional[str] = None) -> str:
+        """
+        Prompt for one line of input and return it stripped.
+        
+        If the answer is empty and required is given, it is printed as the
+        error message; the empty answer is still returned for the caller to act on.
+        """
+        answer = input(prompt).strip()
+        if not answer and required:
+            print(required)
+        return answer
+    
+    @classmethod
+    def _ask_index(cls, prompt: str, count: int, default: Optional[int] = None) -> Optional[int]:
+        """
+        Prompt for a 1-based menu number and return it as a 0-based index.
+        
+        Returns default for an empty answer and None for anything that isn't
+        a number from 1 to count.
+        """
+        answer = cls._ask(prompt)
+        if not answer:
+            return default
+        if answer.isdecimal() and 0 < int(answer) <= count:
+            return int(answer) - 1
+        return None
     
     def _get_list_input(self, prompt: str) -> List[str]:
         """Get a list of items from user input."""
         print(f"\n{prompt} (enter items one per line, empty line to finish):")
         items = []
         while True:
-            item = input("  - ").strip()
+            item = self._ask("  - ")
             if not item:
                 break
             items.append(item)
         return items
 
 
+def _generate_brief_worker(
+    job: Tuple[dict, str, str, List[str]], provider: Optional[str] = None
+) -> Optional[str]:
+    """Generate one brief in a worker process and return its file path, or None on failure."""
+    client_data, topic, primary_kw, secondary_kws = job
+    
+    # Each process builds its own generator; AI provider connections can't be pickled
+    try:
+        brief_data = BriefGenerator(provider=provider).generate_brief(
+            client_data, topic, primary_kw, secondary_kws
+        )
+        return DocumentFormatter().create_brief_document(brief_data)
+    except Exception as e:
+        print(f"Error generating brief for '{client_data.get('client_name', '')}' / '{topic}': {e}")
+        return None
+
+
+def generate_briefs_batch(
+    pairs: List[Tuple[str, str, str, List[str]]],
+    provider: Optional[str] = None,
+    max_workers: int = BATCH_MAX_WORKERS,
+    client_manager: Optional[ClientManager] = None
+) -> List[Optional[str]]:
+    """
+    Generate briefs for many (client name, topic, primary keyword, secondary keywords) tuples.
+    
+    Briefs are independent, so they run in max_workers processes, and each
+    brief makes up to MAX_CONCURRENCY provider calls at once: at most
+    max_workers * MAX_CONCURRENCY requests are in flight, 8 with the
+    defaults. Client profiles are loaded once here and handed to the
+    workers. Returns the saved file
+    paths in input order, with None for any brief that failed or whose
+    client doesn't exist.
+    """
+    client_manager = client_manager or ClientManager()
+    profiles = {}
+    for client_name, *_ in pairs:
+        if client_name not in profiles:
+            profiles[client_name] = client_manager.get_client(client_name)
+    
+    worker = partial(_generate_brief_worker, provider=provider)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Submit every brief before waiting on any, so they all run at once
+        futures = [
+            executor.submit(worker, (profiles[client_name], topic, primary_kw, secondary_kws))
+            if profiles[client_name] else None
+            for client_name, topic, primary_kw, secondary_kws in pairs
+        ]
+        return [future.result() if future is not None else None for future in futures]
+
+
 def main():
     """Entry point for the application."""
     app = ContentBriefCreator()
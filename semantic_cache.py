@@ -0,0 +1,133 @@
+"""
+Semantic AI Response Cache
+Reuses an earlier response when a new prompt means nearly the same thing.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Embedding model and vector index are optional extras
+try:
+    import faiss
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# Sentence embedding model (384-dimensional, small enough for CPU)
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Minimum cosine similarity for a stored response to be reused
+SIMILARITY_THRESHOLD = 0.92
+
+# Directory holding one index and response file per section and scope
+SEMANTIC_CACHE_DIR = ".semantic_cache"
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of AI responses keyed by text embeddings.
+    
+    Each (section, scope) pair gets its own index. The scope must match
+    exactly, so a response is only reused for the same section and, for
+    example, the same client and primary keyword; only the text is compared
+    by meaning.
+    """
+    
+    def __init__(
+        self,
+        directory: str = SEMANTIC_CACHE_DIR,
+        threshold: float = SIMILARITY_THRESHOLD,
+        model_name: str = EMBEDDING_MODEL
+    ):
+        """
+        Initialize semantic cache.
+        
+        Args:
+            directory: Where the per-section indexes are persisted
+            threshold: Minimum cosine similarity for a cache hit
+            model_name: sentence-transformers model used to embed prompts
+        """
+        if not SEMANTIC_CACHE_AVAILABLE:
+            raise ImportError(
+                "The 'sentence-transformers' and 'faiss-cpu' packages are required for the semantic cache"
+            )
+        
+        self.directory = directory
+        self.threshold = threshold
+        self.stats = {"hits": 0, "misses": 0}
+        self._model = SentenceTransformer(model_name)
+        self._indexes: Dict[Tuple[str, str], "faiss.Index"] = {}
+        self._responses: Dict[Tuple[str, str], List[str]] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+    
+    def get(self, section: str, scope: str, text: str) -> Optional[str]:
+        """Return the response stored under scope whose text is closest to text, or None if nothing is close enough."""
+        vector = self._embed(text)
+        with self._lock:
+            index = self._load((section, scope))
+            if index.ntotal:
+                scores, ids = index.search(vector, 1)
+                if scores[0][0] >= self.threshold:
+                    self.stats["hits"] += 1
+                    return self._responses[(section, scope)][ids[0][0]]
+            self.stats["misses"] += 1
+            return None
+    
+    def add(self, section: str, scope: str, text: str, response: str):
+        """Store a response under scope and its text's embedding, and persist that index."""
+        vector = self._embed(text)
+        key = (section, scope)
+        with self._lock:
+            index = self._load(key)
+            index.add(vector)
+            self._responses[key].append(response)
+            self._save(key)
+    
+    def _embed(self, text: str) -> "np.ndarray":
+        """Embed text as a normalized row vector, so inner product is cosine similarity."""
+        vector = self._model.encode([text], normalize_embeddings=True)
+        return np.asarray(vector, dtype="float32")
+    
+    def _paths(self, key: Tuple[str, str]):
+        """Index and response file paths for a (section, scope) pair."""
+        section, scope = key
+        digest = hashlib.sha256(scope.encode('utf-8')).hexdigest()[:16]
+        base = os.path.join(self.directory, f"{section}-{digest}")
+        return f"{base}.faiss", f"{base}.json"
+    
+    def _load(self, key: Tuple[str, str]) -> "faiss.Index":
+        """Get an index, reading it from disk on first use. Caller holds the lock."""
+        if key not in self._indexes:
+            index_path, responses_path = self._paths(key)
+            index, responses = None, []
+            if os.path.exists(index_path) and os.path.exists(responses_path):
+                index = faiss.read_index(index_path)
+                with open(responses_path, 'r', encoding='utf-8') as f:
+                    responses = json.load(f)
+                # Files out of step (another process wrote in between) are
+                # unusable, since ids would map to the wrong responses
+                if index.ntotal != len(responses):
+                    index, responses = None, []
+            if index is None:
+                index = faiss.IndexFlatIP(self._model.get_sentence_embedding_dimension())
+            self._indexes[key] = index
+            self._responses[key] = responses
+        return self._indexes[key]
+    
+    def _save(self, key: Tuple[str, str]):
+        """Write an index and its responses to disk. Caller holds the lock."""
+        index_path, responses_path = self._paths(key)
+        
+        # Write each file beside its target and rename it into place, so a
+        # crash mid-write never leaves a truncated file behind
+        faiss.write_index(self._indexes[key], index_path + ".tmp")
+        with open(responses_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self._responses[key], f, ensure_ascii=False)
+        os.replace(responses_path + ".tmp", responses_path)
+        os.replace(index_path + ".tmp", index_path)
@@ -3,13 +3,46 @@ Supabase Client Profile Management System
 Handles creating, reading, updating, and deleting client profiles using Supabase.
 """
 
+import bisect
+import copy
 import os
-from typing import Dict, List, Optional
+import threading
+import time
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
 from supabase import create_client, Client
+from client_manager import merge_profile_updates
 
 load_dotenv()
 
+# Postgres error code raised when an insert violates a unique constraint
+UNIQUE_VIOLATION = "23505"
+
+# PostgREST error code when an RPC function doesn't exist in the schema
+UNDEFINED_FUNCTION = "PGRST202"
+
+# Database function that merges a partial update into a client row
+MERGE_FUNCTION = "update_client_merge"
+
+# Seconds a fetched client profile or the client name index is served from memory
+CLIENT_CACHE_TTL = 30
+
+
+@lru_cache(maxsize=4)
+def _supabase_client(supabase_url: str, supabase_key: str) -> Client:
+    """Get the process-wide Supabase client for a project, so managers share its pooled connection."""
+    return create_client(supabase_url, supabase_key)
+
+
+class CreateResult(Enum):
+    """Outcome of SupabaseClientManager.create_client_if_absent."""
+    CREATED = "created"
+    EXISTS = "exists"
+    FAILED = "failed"
+
 
 class SupabaseClientManager:
     """Manages client profiles stored in Supabase database."""
@@ -22,60 +55,116 @@ class SupabaseClientManager:
         if not supabase_url or not supabase_key:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in environment variables")
         
-        self.client: Client = create_client(supabase_url, supabase_key)
+        self.client: Client = _supabase_client(supabase_url, supabase_key)
         self.table_name = 'clients'
+        self.briefs_table_name = 'briefs'
+        self._merge_function_available = True
+        
+        # Read cache: profiles by client name, each stored with the monotonic
+        # time it expires at, and a sorted index of every client name that is
+        # kept in step with creates and deletes instead of being refetched
+        self._client_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._names_sorted: Optional[List[str]] = None
+        self._names_expire_at = 0.0
+        self._cache_lock = threading.Lock()
+    
+    def prewarm(self):
+        """
+        Open the database connection and load the client name index ahead of first use.
+        
+        Any failure is ignored; the first real call reports it.
+        """
+        try:
+            self._load_index()
+        except Exception:
+            pass
     
     def create_client(self, client_name: str, client_data: Dict) -> bool:
         """Create a new client profile in Supabase."""
+        return self.create_client_if_absent(client_name, client_data) is CreateResult.CREATED
+    
+    def create_client_if_absent(self, client_name: str, client_data: Dict) -> CreateResult:
+        """
+        Create a client profile in a single round-trip.
+        
+        Relies on the unique constraint on client_name instead of checking for
+        an existing row first, so there is no window for a duplicate insert.
+        """
         try:
-            # Set default structure if not provided
-            default_structure = {
-                "client_name": client_name,
-                "site": "",
-                "industry": "",
-                "target_audience": "",
-                "brand_voice": "",
-                "content_goals": "",
-                "restrictions": {
-                    "legal": [],
-                    "brand": [],
-                    "seo": [],
-                    "content_integrity": []
-                },
-                "requirements": {
-                    "word_count": None,
-                    "readability_score": "",
-                    "tone": "",
-                    "mandatory_mentions": [],
-                    "schema_required": False,
-                    "images_required": 0,
-                    "cta_required": True,
-                    "internal_links_min": 6
-                }
-            }
-            
-            # Merge provided data with defaults
-            merged_data = {**default_structure, **client_data}
-            merged_data["client_name"] = client_name
-            
-            # Insert into Supabase
-            response = self.client.table(self.table_name).insert(merged_data).execute()
+            response = self.client.table(self.table_name).insert(
+                self._with_defaults(client_name, client_data)
+            ).execute()
             
             if response.data:
+                self._index_add(client_name)
                 print(f"Client '{client_name}' created successfully in Supabase.")
-                return True
-            return False
+                return CreateResult.CREATED
+            return CreateResult.FAILED
             
+        except APIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                print(f"Client '{client_name}' already exists.")
+                return CreateResult.EXISTS
+            print(f"Error creating client '{client_name}': {str(e)}")
+            return CreateResult.FAILED
         except Exception as e:
             print(f"Error creating client '{client_name}': {str(e)}")
-            return False
+            return CreateResult.FAILED
+    
+    @staticmethod
+    def _with_defaults(client_name: str, client_data: Dict) -> Dict:
+        """Merge client data over the default profile structure."""
+        # Set default structure if not provided
+        default_structure = {
+            "client_name": client_name,
+            "site": "",
+            "industry": "",
+            "target_audience": "",
+            "brand_voice": "",
+            "content_goals": "",
+            "restrictions": {
+                "legal": [],
+                "brand": [],
+                "seo": [],
+                "content_integrity": []
+            },
+            "requirements": {
+                "word_count": None,
+                "readability_score": "",
+                "tone": "",
+                "mandatory_mentions": [],
+                "schema_required": False,
+                "images_required": 0,
+                "cta_required": True,
+                "internal_links_min": 6
+            }
+        }
+        
+        # Merge provided data with defaults
+        merged_data = {**default_structure, **client_data}
+        merged_data["client_name"] = client_name
+        return merged_data
     
     def get_client(self, client_name: str) -> Optional[Dict]:
-        """Retrieve a client profile from Supabase."""
+        """
+        Retrieve a client profile from Supabase.
+        
+        Profiles are served from memory for CLIENT_CACHE_TTL seconds after
+        they are fetched; callers get a copy they are free to mutate.
+        """
+        with self._cache_lock:
+            cached = self._client_cache.get(client_name)
+            if cached is not None and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+        
         try:
             response = self.client.table(self.table_name).select("*").eq("client_name", client_name).execute()
             
             if response.data and len(response.data) > 0:
+                with self._cache_lock:
+                    self._client_cache[client_name] = (
+                        time.monotonic() + CLIENT_CACHE_TTL, copy.deepcopy(response.data[0])
+                    )
                 return response.data[0]
             
             print(f"Client '{client_name}' not found.")
@@ -86,7 +175,40 @@ class SupabaseClientManager:
             return None
     
     def update_client(self, client_name: str, updates: Dict) -> bool:
-        """Update an existing client profile in Supabase."""
+        """
+        Update an existing client profile in Supabase.
+        
+        The merge runs server-side in the update_client_merge function, so an
+        update is one round-trip. Databases without that function fall back
+        to reading the profile, merging here and writing it back.
+        """
+        if not self._merge_function_available:
+            return self._update_client_read_modify_write(client_name, updates)
+        
+        try:
+            response = self.client.rpc(
+                MERGE_FUNCTION, {"name": client_name, "patch": updates}
+            ).execute()
+        except APIError as e:
+            if e.code != UNDEFINED_FUNCTION:
+                print(f"Error updating client '{client_name}': {str(e)}")
+                return False
+            # Schema predates the function; stop trying it for this manager
+            self._merge_function_available = False
+            return self._update_client_read_modify_write(client_name, updates)
+        except Exception as e:
+            print(f"Error updating client '{client_name}': {str(e)}")
+            return False
+        
+        if response.data:
+            self._index_rename(client_name, response.data[0].get('client_name', client_name))
+            print(f"Client '{client_name}' updated successfully.")
+            return True
+        print(f"Client '{client_name}' not found.")
+        return False
+    
+    def _update_client_read_modify_write(self, client_name: str, updates: Dict) -> bool:
+        """Update a client by fetching it, merging the updates and writing it back."""
         try:
             # Get existing client data
             client_data = self.get_client(client_name)
@@ -94,15 +216,7 @@ class SupabaseClientManager:
             if not client_data:
                 return False
             
-            # Deep merge for nested dictionaries
-            for key, value in updates.items():
-                if isinstance(value, dict) and key in client_data:
-                    if isinstance(client_data[key], dict):
-                        client_data[key].update(value)
-                    else:
-                        client_data[key] = value
-                else:
-                    client_data[key] = value
+            merge_profile_updates(client_data, updates)
             
             # Remove id and created_at fields if present (they shouldn't be updated)
             client_id = client_data.pop('id', None)
@@ -112,6 +226,7 @@ class SupabaseClientManager:
             response = self.client.table(self.table_name).update(client_data).eq("client_name", client_name).execute()
             
             if response.data:
+                self._index_rename(client_name, client_data.get('client_name', client_name))
                 print(f"Client '{client_name}' updated successfully.")
                 return True
             return False
@@ -126,6 +241,7 @@ class SupabaseClientManager:
             response = self.client.table(self.table_name).delete().eq("client_name", client_name).execute()
             
             if response.data:
+                self._index_remove(client_name)
                 print(f"Client '{client_name}' deleted successfully.")
                 return True
             
@@ -137,26 +253,31 @@ class SupabaseClientManager:
             return False
     
     def list_clients(self) -> List[str]:
-        """List all client names from Supabase."""
+        """
+        List all client names from Supabase in sorted order.
+        
+        The names come from an index built by one fetch of every profile and
+        updated in place by create, update and delete, so repeated calls
+        don't re-query or re-sort; it is rebuilt after CLIENT_CACHE_TTL
+        seconds to pick up changes made elsewhere.
+        """
+        with self._cache_lock:
+            if self._names_sorted is not None and self._names_expire_at > time.monotonic():
+                return list(self._names_sorted)
+        
         try:
-            response = self.client.table(self.table_name).select("client_name").execute()
-            
-            if response.data:
-                return sorted([client['client_name'] for client in response.data])
-            return []
-            
+            self._load_index()
         except Exception as e:
             print(f"Error listing clients: {str(e)}")
             return []
+        
+        with self._cache_lock:
+            return list(self._names_sorted or [])
     
     def get_all_clients(self) -> List[Dict]:
         """Get all client profiles from Supabase."""
         try:
-            response = self.client.table(self.table_name).select("*").execute()
-            
-            if response.data:
-                return response.data
-            return []
+            return self._load_index()
             
         except Exception as e:
             print(f"Error getting all clients: {str(e)}")
@@ -165,3 +286,80 @@ class SupabaseClientManager:
     def client_exists(self, client_name: str) -> bool:
         """Check if a client exists in Supabase."""
         return self.get_client(client_name) is not None
+    
+    def _load_index(self) -> List[Dict]:
+        """
+        Fetch every profile and rebuild the name index from it.
+        
+        The fetched profiles also prime the per-client cache, so opening a
+        client picked from the list doesn't cost another round-trip.
+        """
+        response = self.client.table(self.table_name).select("*").order("client_name").execute()
+        records = response.data or []
+        
+        # Postgres sorts by the client_name index, but its collation can order
+        # names differently from Python; the index has to be in Python's order
+        # for bisect, and sorting rows that are already in order is a single pass
+        expires_at = time.monotonic() + CLIENT_CACHE_TTL
+        with self._cache_lock:
+            self._names_sorted = sorted(record['client_name'] for record in records)
+            self._names_expire_at = expires_at
+            for record in records:
+                self._client_cache[record['client_name']] = (expires_at, copy.deepcopy(record))
+        return records
+    
+    def _index_add(self, *client_names: str):
+        """Insert newly created clients into the name index."""
+        with self._cache_lock:
+            for client_name in client_names:
+                self._client_cache.pop(client_name, None)
+                if self._names_sorted is None:
+                    continue
+                position = bisect.bisect_left(self._names_sorted, client_name)
+                if position == len(self._names_sorted) or self._names_sorted[position] != client_name:
+                    self._names_sorted.insert(position, client_name)
+    
+    def _index_remove(self, client_name: str):
+        """Drop a deleted client from the name index."""
+        with self._cache_lock:
+            self._client_cache.pop(client_name, None)
+            if self._names_sorted is None:
+                return
+            position = bisect.bisect_left(self._names_sorted, client_name)
+            if position < len(self._names_sorted) and self._names_sorted[position] == client_name:
+                self._names_sorted.pop(position)
+    
+    def _index_rename(self, old_name: str, new_name: str):
+        """Account for an updated client, which may have been renamed."""
+        if old_name == new_name:
+            with self._cache_lock:
+                self._client_cache.pop(old_name, None)
+            return
+        self._index_remove(old_name)
+        self._index_add(new_name)
+    
+    def save_brief(self, brief_data: Dict) -> bool:
+        """Save a generated brief to Supabase."""
+        try:
+            response = self.client.table(self.briefs_table_name).insert(
+                self._brief_row(brief_data)
+            ).execute()
+            
+            if response.data:
+                print(f"Brief '{brief_data.get('topic', '')}' saved successfully.")
+                return True
+            return False
+            
+        except Exception as e:
+            print(f"Error saving brief '{brief_data.get('topic', '')}': {str(e)}")
+            return False
+    
+    @staticmethod
+    def _brief_row(brief_data: Dict) -> Dict:
+        """Build a briefs table row from generated brief data."""
+        return {
+            "client_name": brief_data.get("client_name", ""),
+            "topic": brief_data.get("topic", ""),
+            "primary_kw": brief_data.get("primary_kw", ""),
+            "content": brief_data
+        }
@@ -32,6 +32,19 @@ CREATE TABLE IF NOT EXISTS clients (
 -- Create index on client_name for faster lookups
 CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(client_name);
 
+-- Generated briefs, one row per generation
+CREATE TABLE IF NOT EXISTS briefs (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    client_name TEXT NOT NULL,
+    topic TEXT DEFAULT '',
+    primary_kw TEXT DEFAULT '',
+    content JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT timezone('utc'::text, now()) NOT NULL
+);
+
+-- Create index on client_name for listing a client's briefs
+CREATE INDEX IF NOT EXISTS idx_briefs_client_name ON briefs(client_name);
+
 -- Create function to automatically update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -47,11 +60,61 @@ CREATE TRIGGER update_clients_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Apply a partial update to a client in one round-trip: top-level fields in
+-- the patch replace the stored value, except objects (restrictions,
+-- requirements), whose keys are merged into the stored object
+CREATE OR REPLACE FUNCTION update_client_merge(name TEXT, patch JSONB)
+RETURNS SETOF clients AS $$
+DECLARE
+    existing clients;
+    merged JSONB;
+    updated clients;
+BEGIN
+    SELECT * INTO existing FROM clients WHERE client_name = name FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT to_jsonb(existing) || COALESCE(jsonb_object_agg(
+        key,
+        CASE
+            WHEN jsonb_typeof(value) = 'object'
+                AND jsonb_typeof(to_jsonb(existing) -> key) = 'object'
+            THEN (to_jsonb(existing) -> key) || value
+            ELSE value
+        END
+    ), '{}'::jsonb)
+    INTO merged
+    FROM jsonb_each(patch - 'id' - 'created_at');
+
+    updated := jsonb_populate_record(existing, merged);
+
+    RETURN QUERY
+    UPDATE clients SET
+        client_name = updated.client_name,
+        site = updated.site,
+        industry = updated.industry,
+        target_audience = updated.target_audience,
+        brand_voice = updated.brand_voice,
+        content_goals = updated.content_goals,
+        restrictions = updated.restrictions,
+        requirements = updated.requirements
+    WHERE id = existing.id
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE clients ENABLE ROW LEVEL SECURITY;
+ALTER TABLE briefs ENABLE ROW LEVEL SECURITY;
 
 -- Create policy to allow all operations (adjust based on your auth requirements)
 CREATE POLICY "Enable all operations for authenticated users" ON clients
     FOR ALL
     USING (true)
     WITH CHECK (true);
+
+CREATE POLICY "Enable all operations for authenticated users" ON briefs
+    FOR ALL
+    USING (true)
+    WITH CHECK (true);